@@ -0,0 +1,32 @@
+"""Add resumes.content_sha256 with a unique (job_id, content_sha256) constraint
+
+Revision ID: 0a6d3f8b2c71
+Revises: f2a9c6d1e3b5
+Create Date: 2026-10-14 13:58:36.912064
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6d3f8b2c71'
+down_revision: Union[str, None] = 'f2a9c6d1e3b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('resumes', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_unique_constraint(
+        'uq_resumes_job_content_sha256',
+        'resumes',
+        ['job_id', 'content_sha256'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_resumes_job_content_sha256', 'resumes', type_='unique')
+    op.drop_column('resumes', 'content_sha256')
@@ -0,0 +1,32 @@
+"""Add covering index on resumes (job_id, parsing_status) INCLUDE (score)
+
+Revision ID: 3b7e9d0c5a12
+Revises: 8c1f2a7d4e91
+Create Date: 2026-10-14 09:40:07.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9d0c5a12'
+down_revision: Union[str, None] = '8c1f2a7d4e91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_resumes_job_status_score',
+        'resumes',
+        ['job_id', 'parsing_status'],
+        unique=False,
+        postgresql_include=['score'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resumes_job_status_score', table_name='resumes')
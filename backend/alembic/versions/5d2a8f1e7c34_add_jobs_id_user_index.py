@@ -0,0 +1,26 @@
+"""Add composite index on jobs (id, user_id) for ownership checks
+
+Revision ID: 5d2a8f1e7c34
+Revises: 3b7e9d0c5a12
+Create Date: 2026-10-14 11:02:51.604217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a8f1e7c34'
+down_revision: Union[str, None] = '3b7e9d0c5a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_jobs_id_user', 'jobs', ['id', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_id_user', table_name='jobs')
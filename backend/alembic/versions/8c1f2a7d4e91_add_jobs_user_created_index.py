@@ -0,0 +1,33 @@
+"""Add covering index on jobs (user_id, created_at DESC)
+
+Revision ID: 8c1f2a7d4e91
+Revises: 123ed293be28
+Create Date: 2026-10-14 09:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f2a7d4e91'
+down_revision: Union[str, None] = '123ed293be28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_jobs_user_created',
+        'jobs',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_using='btree',
+        postgresql_include=['id', 'title', 'status', 'location', 'employment_type'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_user_created', table_name='jobs')
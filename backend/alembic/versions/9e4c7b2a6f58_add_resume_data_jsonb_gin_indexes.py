@@ -0,0 +1,38 @@
+"""Add GIN (jsonb_path_ops) indexes on resume_data JSONB columns
+
+Revision ID: 9e4c7b2a6f58
+Revises: 5d2a8f1e7c34
+Create Date: 2026-10-14 11:37:14.290518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4c7b2a6f58'
+down_revision: Union[str, None] = '5d2a8f1e7c34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+JSONB_COLUMNS = ('skills', 'experience', 'education', 'certifications', 'languages')
+
+
+def upgrade() -> None:
+    for column in JSONB_COLUMNS:
+        op.create_index(
+            f'ix_resume_data_{column}_gin',
+            'resume_data',
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'jsonb_path_ops'},
+        )
+
+
+def downgrade() -> None:
+    for column in JSONB_COLUMNS:
+        op.drop_index(f'ix_resume_data_{column}_gin', table_name='resume_data')
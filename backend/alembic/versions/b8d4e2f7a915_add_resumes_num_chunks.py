@@ -0,0 +1,26 @@
+"""Add resumes.num_chunks for deleting vector chunks by ID
+
+Revision ID: b8d4e2f7a915
+Revises: 0a6d3f8b2c71
+Create Date: 2026-10-14 14:42:10.318527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8d4e2f7a915'
+down_revision: Union[str, None] = '0a6d3f8b2c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('resumes', sa.Column('num_chunks', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('resumes', 'num_chunks')
@@ -0,0 +1,54 @@
+"""Add server-side defaults for timestamps, statuses, flags and JSONB columns
+
+Revision ID: c41f6e9a2b87
+Revises: 9e4c7b2a6f58
+Create Date: 2026-10-14 12:15:48.773905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f6e9a2b87'
+down_revision: Union[str, None] = '9e4c7b2a6f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, server default)
+SERVER_DEFAULTS = [
+    ('users', 'is_active', sa.text("true")),
+    ('users', 'is_superuser', sa.text("false")),
+    ('users', 'created_at', sa.text("now()")),
+    ('users', 'updated_at', sa.text("now()")),
+    ('jobs', 'status', sa.text("'open'")),
+    ('jobs', 'created_at', sa.text("now()")),
+    ('jobs', 'updated_at', sa.text("now()")),
+    ('resumes', 'upload_status', sa.text("'uploaded'")),
+    ('resumes', 'parsing_status', sa.text("'pending'")),
+    ('resumes', 'created_at', sa.text("now()")),
+    ('resumes', 'updated_at', sa.text("now()")),
+    ('resume_data', 'skills', sa.text("'[]'::jsonb")),
+    ('resume_data', 'experience', sa.text("'[]'::jsonb")),
+    ('resume_data', 'education', sa.text("'[]'::jsonb")),
+    ('resume_data', 'certifications', sa.text("'[]'::jsonb")),
+    ('resume_data', 'languages', sa.text("'[]'::jsonb")),
+    ('resume_data', 'resume_metadata', sa.text("'{}'::jsonb")),
+    ('resume_data', 'created_at', sa.text("now()")),
+    ('resume_data', 'updated_at', sa.text("now()")),
+    ('resume_embeddings', 'embedding_metadata', sa.text("'{}'::jsonb")),
+    ('resume_embeddings', 'created_at', sa.text("now()")),
+]
+
+
+def upgrade() -> None:
+    for table, column, default in SERVER_DEFAULTS:
+        op.alter_column(table, column, server_default=default)
+
+
+def downgrade() -> None:
+    for table, column, _ in SERVER_DEFAULTS:
+        op.alter_column(table, column, server_default=None)
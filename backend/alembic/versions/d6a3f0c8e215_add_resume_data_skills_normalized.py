@@ -0,0 +1,30 @@
+"""Add resume_data.skills_normalized for scoring without per-call normalization
+
+Revision ID: d6a3f0c8e215
+Revises: b8d4e2f7a915
+Create Date: 2026-10-15 09:12:47.205318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6a3f0c8e215'
+down_revision: Union[str, None] = 'b8d4e2f7a915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'resume_data',
+        sa.Column('skills_normalized', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('resume_data', 'skills_normalized')
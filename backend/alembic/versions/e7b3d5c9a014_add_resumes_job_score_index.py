@@ -0,0 +1,33 @@
+"""Add index on resumes (job_id, score DESC NULLS LAST, parsing_status) for ranking
+
+Revision ID: e7b3d5c9a014
+Revises: c41f6e9a2b87
+Create Date: 2026-10-14 12:48:22.051337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3d5c9a014'
+down_revision: Union[str, None] = 'c41f6e9a2b87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_resumes_job_score',
+        'resumes',
+        ['job_id', sa.text('score DESC NULLS LAST'), 'parsing_status'],
+        unique=False,
+        postgresql_using='btree',
+        postgresql_include=['candidate_name', 'rank', 'file_name'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resumes_job_score', table_name='resumes')
@@ -0,0 +1,31 @@
+"""Drop redundant primary key indexes on resume tables
+
+Revision ID: f2a9c6d1e3b5
+Revises: e7b3d5c9a014
+Create Date: 2026-10-14 13:20:09.447610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9c6d1e3b5'
+down_revision: Union[str, None] = 'e7b3d5c9a014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Primary keys already have a unique index
+    op.drop_index('ix_resumes_id', table_name='resumes')
+    op.drop_index('ix_resume_data_id', table_name='resume_data')
+    op.drop_index('ix_resume_embeddings_id', table_name='resume_embeddings')
+
+
+def downgrade() -> None:
+    op.create_index('ix_resume_embeddings_id', 'resume_embeddings', ['id'], unique=False)
+    op.create_index('ix_resume_data_id', 'resume_data', ['id'], unique=False)
+    op.create_index('ix_resumes_id', 'resumes', ['id'], unique=False)
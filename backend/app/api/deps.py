@@ -10,12 +10,39 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
+from app.core.cache import TTLCache
 from app.core.security import decode_access_token
 from app.models import User
 
 # Security scheme
 security = HTTPBearer()
 
+# Recently authenticated users, keyed by user ID (in-process, like the other
+# caches in app.core.cache). Routes that change a user row invalidate it;
+# changes made outside the API (e.g. is_active set in the database) take up
+# to the TTL to apply, so a deactivated account keeps working on an
+# already-issued token for at most USER_CACHE_TTL_SECONDS.
+USER_CACHE_TTL_SECONDS = 60
+_user_cache = TTLCache(maxsize=4096, ttl=USER_CACHE_TTL_SECONDS)
+
+# Columns kept in the cache (the password hash is never needed downstream)
+_CACHED_USER_COLUMNS = tuple(
+    column.key for column in User.__table__.columns if column.key != "hashed_password"
+)
+
+
+def invalidate_cached_user(user_id: UUID) -> None:
+    """
+    Drop a user from the authentication cache.
+    
+    Call after changing anything on the user row through the API (status,
+    password, profile).
+    
+    Args:
+        user_id: User ID
+    """
+    _user_cache.delete(user_id)
+
 
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
@@ -45,16 +72,8 @@ async def get_current_user(
         )
     
     # Extract user_id from token
-    user_id_str: str = payload.get("sub")
-    if user_id_str is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
     try:
-        user_id = UUID(user_id_str)
+        user_id = UUID(payload.sub)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,6 +81,11 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Serve from cache when possible (detached User, not bound to db)
+    cached = _user_cache.get(user_id)
+    if cached is not None:
+        return User(**cached)
+    
     # Get user from database
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -73,6 +97,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    _user_cache.set(user_id, {key: getattr(user, key) for key in _CACHED_USER_COLUMNS})
+    
     return user
 
 
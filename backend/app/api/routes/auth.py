@@ -5,12 +5,13 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import User
 from app.schemas import Token, LoginRequest, SignupRequest, User as UserSchema
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import averify_and_update_password, aget_password_hash, create_access_token
 
 router = APIRouter()
 
@@ -28,29 +29,29 @@ async def signup(
     - **full_name**: User's full name
     - **company_name**: Optional company name
     """
-    # Check if user already exists
-    result = await db.execute(
-        select(User).where(User.email == signup_data.email)
+    # Create new user; the unique email index rejects duplicates atomically,
+    # so no pre-check SELECT (and no race between check and insert)
+    stmt = (
+        insert(User)
+        .values(
+            email=signup_data.email,
+            hashed_password=await aget_password_hash(signup_data.password),
+            full_name=signup_data.full_name,
+            company_name=signup_data.company_name,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
     )
-    existing_user = result.scalar_one_or_none()
+    result = await db.execute(stmt)
+    new_user = result.scalar_one_or_none()
     
-    if existing_user:
+    if new_user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    # Create new user
-    new_user = User(
-        email=signup_data.email,
-        hashed_password=get_password_hash(signup_data.password),
-        full_name=signup_data.full_name,
-        company_name=signup_data.company_name,
-    )
-    
-    db.add(new_user)
     await db.commit()
-    await db.refresh(new_user)
     
     return new_user
 
@@ -74,8 +75,13 @@ async def login(
     )
     user = result.scalar_one_or_none()
     
-    # Verify user exists and password is correct
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    # Verify password even when the user is missing (constant-time rejection)
+    password_ok, new_hash = await averify_and_update_password(
+        login_data.password,
+        user.hashed_password if user else None
+    )
+    
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -89,6 +95,12 @@ async def login(
             detail="Inactive user"
         )
     
+    # Transparently upgrade hashes created with older Argon2 parameters
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_cached_user(user.id)
+    
     # Create access token
     access_token = create_access_token(subject=user.id)
     
@@ -96,7 +108,7 @@ async def login(
 
 
 # Import here to avoid circular dependency
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, invalidate_cached_user
 
 @router.get("/me", response_model=UserSchema)
 async def get_current_user_info(
@@ -5,16 +5,34 @@ from typing import Annotated, List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, desc
+from sqlalchemy import func, select, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import Job, User
-from app.schemas import Job as JobSchema, JobCreate, JobUpdate, JobList
+from app.models import Job, Resume, User
+from app.schemas import Job as JobSchema, JobCreate, JobUpdate, JobList, JobStatus
 from app.api.deps import get_current_user
+from app.core.cache import invalidate_job_resumes
+from app.services.scoring import scoring_service
+from app.services.task_queue import scoring_queue
 
 router = APIRouter()
 
+# Job fields that make up the text embedded for scoring
+_SCORING_TEXT_FIELDS = {"title", "description", "requirements"}
+
+
+def _prefetch_job_embedding(job: Job) -> None:
+    """Queue embedding of the job's text so scoring finds it cached."""
+    scoring_queue.submit(
+        scoring_service.prefetch_job_embedding,
+        {
+            'title': job.title,
+            'description': job.description,
+            'requirements': job.requirements or ''
+        }
+    )
+
 
 @router.post("", response_model=JobSchema, status_code=status.HTTP_201_CREATED)
 async def create_job(
@@ -36,13 +54,6 @@ async def create_job(
     
     Requires authentication.
     """
-    # Validate status
-    if job_data.status not in ["open", "closed", "draft"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Status must be 'open', 'closed', or 'draft'"
-        )
-    
     # Create new job
     new_job = Job(
         user_id=current_user.id,
@@ -59,6 +70,7 @@ async def create_job(
     db.add(new_job)
     await db.commit()
     await db.refresh(new_job)
+    _prefetch_job_embedding(new_job)
     
     return new_job
 
@@ -67,7 +79,7 @@ async def create_job(
 async def list_jobs(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
-    status_filter: str | None = Query(None, description="Filter by status: open, closed, draft"),
+    status_filter: JobStatus | None = Query(None, description="Filter by status: open, closed, draft"),
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Number of records to return")
 ):
@@ -80,16 +92,18 @@ async def list_jobs(
     
     Returns list of jobs ordered by creation date (newest first).
     """
-    # Build query
-    query = select(Job).where(Job.user_id == current_user.id)
+    # Build query (only the JobList columns; skips description/requirements)
+    query = select(
+        Job.id,
+        Job.title,
+        Job.location,
+        Job.employment_type,
+        Job.status,
+        Job.created_at,
+    ).where(Job.user_id == current_user.id)
     
     # Apply status filter if provided
     if status_filter:
-        if status_filter not in ["open", "closed", "draft"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Status must be 'open', 'closed', or 'draft'"
-            )
         query = query.where(Job.status == status_filter)
     
     # Apply ordering and pagination
@@ -97,7 +111,7 @@ async def list_jobs(
     
     # Execute query
     result = await db.execute(query)
-    jobs = result.scalars().all()
+    jobs = result.all()
     
     return jobs
 
@@ -114,9 +128,9 @@ async def get_job(
     Returns full job details.
     Only the job owner can access.
     """
-    # Get job
+    # Get job owned by the current user
     result = await db.execute(
-        select(Job).where(Job.id == job_id)
+        select(Job).where(Job.id == job_id, Job.user_id == current_user.id)
     )
     job = result.scalar_one_or_none()
     
@@ -127,13 +141,6 @@ async def get_job(
             detail="Job not found"
         )
     
-    # Check ownership
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this job"
-        )
-    
     return job
 
 
@@ -150,9 +157,9 @@ async def update_job(
     Only the job owner can update.
     Provide only the fields you want to update.
     """
-    # Get job
+    # Get job owned by the current user
     result = await db.execute(
-        select(Job).where(Job.id == job_id)
+        select(Job).where(Job.id == job_id, Job.user_id == current_user.id)
     )
     job = result.scalar_one_or_none()
     
@@ -163,20 +170,6 @@ async def update_job(
             detail="Job not found"
         )
     
-    # Check ownership
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this job"
-        )
-    
-    # Validate status if provided
-    if job_data.status and job_data.status not in ["open", "closed", "draft"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Status must be 'open', 'closed', or 'draft'"
-        )
-    
     # Update fields (only if provided)
     update_data = job_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -184,6 +177,8 @@ async def update_job(
     
     await db.commit()
     await db.refresh(job)
+    if update_data.keys() & _SCORING_TEXT_FIELDS:
+        _prefetch_job_embedding(job)
     
     return job
 
@@ -200,9 +195,9 @@ async def delete_job(
     Only the job owner can delete.
     This will also delete all associated resumes (cascade).
     """
-    # Get job
+    # Get job owned by the current user
     result = await db.execute(
-        select(Job).where(Job.id == job_id)
+        select(Job).where(Job.id == job_id, Job.user_id == current_user.id)
     )
     job = result.scalar_one_or_none()
     
@@ -213,16 +208,10 @@ async def delete_job(
             detail="Job not found"
         )
     
-    # Check ownership
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this job"
-        )
-    
-    # Delete job (cascades to resumes)
+    # Delete job (the database cascades to resumes)
     await db.delete(job)
     await db.commit()
+    invalidate_job_resumes(job_id)
     
     return None
 
@@ -242,9 +231,9 @@ async def get_job_stats(
     - Pending resumes
     - Average score
     """
-    # Get job
+    # Get job owned by the current user
     result = await db.execute(
-        select(Job).where(Job.id == job_id)
+        select(Job).where(Job.id == job_id, Job.user_id == current_user.id)
     )
     job = result.scalar_one_or_none()
     
@@ -255,22 +244,12 @@ async def get_job_stats(
             detail="Job not found"
         )
     
-    # Check ownership
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this job"
-        )
-    
-    # Import Resume model here to avoid circular import
-    from app.models import Resume
-    from sqlalchemy import func
-    
-    # Get resume statistics
+    # Get resume statistics in a single pass; count(*) keeps this answerable
+    # from ix_resumes_job_status_score without touching the heap
     stats_query = select(
-        func.count(Resume.id).label("total_resumes"),
-        func.count(Resume.id).filter(Resume.parsing_status == "completed").label("parsed_resumes"),
-        func.count(Resume.id).filter(Resume.parsing_status == "pending").label("pending_resumes"),
+        func.count().label("total_resumes"),
+        func.count().filter(Resume.parsing_status == "completed").label("parsed_resumes"),
+        func.count().filter(Resume.parsing_status == "pending").label("pending_resumes"),
         func.avg(Resume.score).label("average_score")
     ).where(Resume.job_id == job_id)
     
@@ -1,153 +1,217 @@
 """
 Resume parsing routes: Parse and extract structured data from resumes.
 """
+import asyncio
 import logging
-from typing import Annotated
+from typing import Annotated, Any, Dict, List
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db
 from app.models import Resume, Job, User, ResumeData
 from app.schemas import Resume as ResumeSchema, ResumeWithData
 from app.api.deps import get_current_user
+from app.core.cache import invalidate_job_resumes
+from app.services.file_storage import file_storage
 from app.services.text_extraction import text_extractor
 from app.services.rag_langchain import langchain_rag_service
 from app.services.resume_parser import resume_parser
+from app.services.scoring import normalize_skills
+from app.services.task_queue import parse_queue
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-async def parse_resume_background(resume_id: UUID, db: AsyncSession):
+# Chunks per vector store call (each call is one embeddings request), and how
+# many calls may run at once
+EMBEDDING_BATCH_SIZE = 256
+EMBEDDING_MAX_CONCURRENCY = 4
+
+
+async def _add_chunks_in_batches(
+    resume_id: UUID,
+    chunks: List[str],
+    metadata_list: List[Dict[str, Any]]
+) -> bool:
+    """
+    Add resume chunks to the vector store in concurrent batches.
+    
+    Args:
+        resume_id: Resume ID
+        chunks: Text chunks
+        metadata_list: Metadata for each chunk (must include chunk_index)
+        
+    Returns:
+        True if every batch was stored
+    """
+    semaphore = asyncio.Semaphore(EMBEDDING_MAX_CONCURRENCY)
+    
+    async def add_batch(start: int) -> bool:
+        async with semaphore:
+            return await langchain_rag_service.add_documents_to_vectorstore(
+                resume_id=resume_id,
+                text_chunks=chunks[start:start + EMBEDDING_BATCH_SIZE],
+                metadata_list=metadata_list[start:start + EMBEDDING_BATCH_SIZE]
+            )
+    
+    results = await asyncio.gather(
+        *(add_batch(start) for start in range(0, len(chunks), EMBEDDING_BATCH_SIZE))
+    )
+    return all(results)
+
+
+async def parse_resume_background(resume_id: UUID):
     """
     Background task to parse resume.
     
+    Opens its own database session: the request-scoped session is closed
+    by the time background tasks run.
+    
     Args:
         resume_id: Resume ID to parse
-        db: Database session
     """
-    try:
-        # Get resume
-        result = await db.execute(
-            select(Resume).where(Resume.id == resume_id)
-        )
-        resume = result.scalar_one_or_none()
+    async with AsyncSessionLocal() as db:
+        job_id = None
+        try:
+            # Get resume with its parsed data (if re-parsing) in one go
+            result = await db.execute(
+                select(Resume)
+                .options(selectinload(Resume.resume_data))
+                .where(Resume.id == resume_id)
+            )
+            resume = result.scalar_one_or_none()
         
-        if not resume:
-            logger.error(f"Resume {resume_id} not found for parsing")
-            return
+            if not resume:
+                logger.error(f"Resume {resume_id} not found for parsing")
+                return
+            # Kept for the failure path, where the rolled-back row can't be read
+            job_id = resume.job_id
         
-        # Update status to processing
-        resume.parsing_status = "processing"
-        await db.commit()
+            # Update status to processing
+            resume.parsing_status = "processing"
+            await db.commit()
+            invalidate_job_resumes(resume.job_id)
         
-        logger.info(f"Starting to parse resume {resume_id}")
+            logger.info(f"Starting to parse resume {resume_id}")
         
-        # Get file content from storage (works for both local and S3)
-        from app.services.file_storage import file_storage
-        file_content = await file_storage.get_file(resume.file_path)
+            # Get file content from storage (works for both local and S3)
+            file_content = await file_storage.get_file(resume.file_path)
         
-        # Extract text from file content bytes
-        raw_text = await text_extractor.extract_text_from_bytes(
-            file_content, 
-            resume.file_type
-        )
+            # Extract text from file content bytes
+            raw_text = await text_extractor.extract_text_from_bytes(
+                file_content, 
+                resume.file_type
+            )
         
-        # Parse with LLM
-        parsed_data = await resume_parser.parse_resume(raw_text)
+            # Parse with LLM
+            parsed_data = await resume_parser.parse_resume(raw_text)
         
-        # Update resume with extracted candidate info
-        if parsed_data.get("candidate_name"):
-            resume.candidate_name = parsed_data["candidate_name"]
-        if parsed_data.get("candidate_email"):
-            resume.candidate_email = parsed_data["candidate_email"]
+            # Update resume with extracted candidate info
+            if parsed_data.get("candidate_name"):
+                resume.candidate_name = parsed_data["candidate_name"]
+            if parsed_data.get("candidate_email"):
+                resume.candidate_email = parsed_data["candidate_email"]
         
-        # Create or update resume_data
-        result = await db.execute(
-            select(ResumeData).where(ResumeData.resume_id == resume_id)
-        )
-        resume_data = result.scalar_one_or_none()
+            # Create or update resume_data
+            resume_data = resume.resume_data
         
-        if resume_data:
-            # Update existing
-            resume_data.raw_text = raw_text
-            resume_data.skills = parsed_data.get("skills", [])
-            resume_data.experience = parsed_data.get("experience", [])
-            resume_data.education = parsed_data.get("education", [])
-            resume_data.certifications = parsed_data.get("certifications", [])
-            resume_data.languages = parsed_data.get("languages", [])
-            resume_data.total_experience_years = parsed_data.get("total_experience_years")
-            resume_data.summary = parsed_data.get("summary")
-            resume_data.metadata = parsed_data.get("metadata", {})
-        else:
-            # Create new
-            resume_data = ResumeData(
-                resume_id=resume_id,
-                raw_text=raw_text,
-                skills=parsed_data.get("skills", []),
-                experience=parsed_data.get("experience", []),
-                education=parsed_data.get("education", []),
-                certifications=parsed_data.get("certifications", []),
-                languages=parsed_data.get("languages", []),
-                total_experience_years=parsed_data.get("total_experience_years"),
-                summary=parsed_data.get("summary"),
-                metadata=parsed_data.get("metadata", {})
-            )
-            db.add(resume_data)
+            if resume_data:
+                # Update existing
+                resume_data.raw_text = raw_text
+                resume_data.skills = parsed_data.get("skills", [])
+                resume_data.skills_normalized = normalize_skills(parsed_data.get("skills", []))
+                resume_data.experience = parsed_data.get("experience", [])
+                resume_data.education = parsed_data.get("education", [])
+                resume_data.certifications = parsed_data.get("certifications", [])
+                resume_data.languages = parsed_data.get("languages", [])
+                resume_data.total_experience_years = parsed_data.get("total_experience_years")
+                resume_data.summary = parsed_data.get("summary")
+                resume_data.resume_metadata = parsed_data.get("metadata", {})
+            else:
+                # Create new
+                await ResumeData.bulk_insert(db, [{
+                    "resume_id": resume_id,
+                    "raw_text": raw_text,
+                    "skills": parsed_data.get("skills", []),
+                    "skills_normalized": normalize_skills(parsed_data.get("skills", [])),
+                    "experience": parsed_data.get("experience", []),
+                    "education": parsed_data.get("education", []),
+                    "certifications": parsed_data.get("certifications", []),
+                    "languages": parsed_data.get("languages", []),
+                    "total_experience_years": parsed_data.get("total_experience_years"),
+                    "summary": parsed_data.get("summary"),
+                    "resume_metadata": parsed_data.get("metadata", {})
+                }])
         
-        # Update resume status
-        resume.parsing_status = "completed"
+            # Update resume status. The chunk count is cleared until the new
+            # chunks are all stored, so a partial run falls back to deleting
+            # by metadata scan.
+            resume.parsing_status = "completed"
+            previous_num_chunks = resume.num_chunks
+            resume.num_chunks = None
         
-        await db.commit()
-        logger.info(f"Successfully parsed resume {resume_id}")
+            await db.commit()
+            invalidate_job_resumes(resume.job_id)
+            logger.info(f"Successfully parsed resume {resume_id}")
 
-        # Create embeddings for RAG using LangChain (don't fail if this errors)
-        try:
-            # Chunk the text
-            chunks = text_extractor.chunk_text(raw_text, chunk_size=1000, overlap=100)
+            # Create embeddings for RAG using LangChain (don't fail if this errors)
+            try:
+                # Drop chunks of a previous parse first: upserts reuse IDs
+                # "{resume_id}:{i}", so a shorter re-parse would leave the old
+                # tail behind
+                await langchain_rag_service.delete_documents(resume_id, previous_num_chunks)
             
-            # Add metadata to chunks
-            metadata_list = []
-            for i, chunk in enumerate(chunks):
-                metadata_list.append({
-                    "candidate_name": resume.candidate_name or "Unknown",
-                    "job_id": str(resume.job_id),
-                    "chunk_index": i,
-                    "total_chunks": len(chunks)
-                })
+                # Chunk the text (off the event loop)
+                chunks = await asyncio.to_thread(
+                    text_extractor.chunk_text, raw_text, chunk_size=1000, overlap=100
+                )
             
-            # Store in vector database using LangChain
-            success = await langchain_rag_service.add_documents_to_vectorstore(
-                resume_id=resume_id,
-                text_chunks=chunks,
-                metadata_list=metadata_list
-            )
+                # Add metadata to chunks
+                metadata_list = []
+                for i, chunk in enumerate(chunks):
+                    metadata_list.append({
+                        "candidate_name": resume.candidate_name or "Unknown",
+                        "job_id": str(resume.job_id),
+                        "chunk_index": i,
+                        "total_chunks": len(chunks)
+                    })
             
-            if success:
-                logger.info(f"Created {len(chunks)} embeddings for resume {resume_id} using LangChain")
+                # Store in vector database using LangChain, in concurrent batches
+                success = await _add_chunks_in_batches(resume_id, chunks, metadata_list)
             
-        except Exception as e:
-            logger.warning(f"Failed to create embeddings for resume {resume_id}: {str(e)}")
-            # Don't fail the whole parsing if embeddings fail
+                if success:
+                    resume.num_chunks = len(chunks)
+                    await db.commit()
+                    logger.info(f"Created {len(chunks)} embeddings for resume {resume_id} using LangChain")
+            
+            except Exception as e:
+                logger.warning(f"Failed to create embeddings for resume {resume_id}: {str(e)}")
+                # Don't fail the whole parsing if embeddings fail
         
-    except Exception as e:
-        logger.error(f"Failed to parse resume {resume_id}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to parse resume {resume_id}: {str(e)}")
         
-        # Update status to failed
-        try:
-            result = await db.execute(
-                select(Resume).where(Resume.id == resume_id)
-            )
-            resume = result.scalar_one_or_none()
-            if resume:
-                resume.parsing_status = "failed"
+            # Update status to failed with a plain UPDATE: the rollback expires
+            # the loaded row, and reloading it would be an implicit lazy load,
+            # which AsyncSession can't do
+            try:
+                await db.rollback()
+                await db.execute(
+                    update(Resume)
+                    .where(Resume.id == resume_id)
+                    .values(parsing_status="failed")
+                    .execution_options(synchronize_session=False)
+                )
                 await db.commit()
-        except:
-            pass
+                if job_id is not None:
+                    invalidate_job_resumes(job_id)
+            except Exception as e:
+                logger.error(f"Failed to mark resume {resume_id} as failed: {str(e)}")
 
 
 @router.post("/resumes/{resume_id}/parse", response_model=dict)
@@ -164,11 +228,11 @@ async def trigger_resume_parsing(
     
     Returns immediately while parsing happens in background.
     """
-    # Get resume with job
+    # Get resume, scoped to jobs owned by the current user
     result = await db.execute(
         select(Resume)
-        .options(selectinload(Resume.job))
-        .where(Resume.id == resume_id)
+        .join(Resume.job)
+        .where(Resume.id == resume_id, Job.user_id == current_user.id)
     )
     resume = result.scalar_one_or_none()
     
@@ -178,13 +242,6 @@ async def trigger_resume_parsing(
             detail="Resume not found"
         )
     
-    # Check ownership
-    if resume.job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to parse this resume"
-        )
-    
     # Check if already parsed
     if resume.parsing_status == "completed":
         return {
@@ -202,7 +259,7 @@ async def trigger_resume_parsing(
         }
     
     # Add to background tasks
-    background_tasks.add_task(parse_resume_background, resume_id, db)
+    background_tasks.add_task(parse_resume_background, resume_id)
     
     return {
         "message": "Resume parsing started",
@@ -214,7 +271,6 @@ async def trigger_resume_parsing(
 @router.post("/jobs/{job_id}/parse-all", response_model=dict)
 async def parse_all_resumes(
     job_id: UUID,
-    background_tasks: BackgroundTasks,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
@@ -227,7 +283,7 @@ async def parse_all_resumes(
     """
     # Verify job exists and user owns it
     result = await db.execute(
-        select(Job).where(Job.id == job_id)
+        select(Job).where(Job.id == job_id, Job.user_id == current_user.id)
     )
     job = result.scalar_one_or_none()
     
@@ -237,36 +293,30 @@ async def parse_all_resumes(
             detail="Job not found"
         )
     
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to parse resumes for this job"
-        )
-    
-    # Get all pending resumes
+    # Get IDs of all pending resumes (nothing else is needed to enqueue)
     result = await db.execute(
-        select(Resume).where(
+        select(Resume.id).where(
             Resume.job_id == job_id,
             Resume.parsing_status == "pending"
         )
     )
-    pending_resumes = result.scalars().all()
+    pending_ids = result.scalars().all()
     
-    if not pending_resumes:
+    if not pending_ids:
         return {
             "message": "No pending resumes to parse",
             "job_id": str(job_id),
             "count": 0
         }
     
-    # Add all to background tasks
-    for resume in pending_resumes:
-        background_tasks.add_task(parse_resume_background, resume.id, db)
+    # Fan out on the parse queue so storage and LLM latency overlap
+    for resume_id in pending_ids:
+        parse_queue.submit(parse_resume_background, resume_id)
     
     return {
-        "message": f"Parsing started for {len(pending_resumes)} resumes",
+        "message": f"Parsing started for {len(pending_ids)} resumes",
         "job_id": str(job_id),
-        "count": len(pending_resumes)
+        "count": len(pending_ids)
     }
 
 
@@ -281,14 +331,12 @@ async def get_parsed_resume_data(
     
     Returns resume with full parsed data if available.
     """
-    # Get resume with job and parsed data
+    # Get resume with parsed data, scoped to jobs owned by the current user
     result = await db.execute(
         select(Resume)
-        .options(
-            selectinload(Resume.job),
-            selectinload(Resume.resume_data)
-        )
-        .where(Resume.id == resume_id)
+        .join(Resume.job)
+        .options(selectinload(Resume.resume_data))
+        .where(Resume.id == resume_id, Job.user_id == current_user.id)
     )
     resume = result.scalar_one_or_none()
     
@@ -298,13 +346,6 @@ async def get_parsed_resume_data(
             detail="Resume not found"
         )
     
-    # Check ownership
-    if resume.job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this resume"
-        )
-    
     if resume.parsing_status != "completed":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -22,7 +22,7 @@ router = APIRouter()
 class QueryRequest(BaseModel):
     """Request model for RAG query."""
     query: str = Field(..., min_length=1, max_length=500, description="Natural language query")
-    top_k: int = Field(5, ge=1, le=20, description="Number of relevant chunks to retrieve")
+    top_k: Optional[int] = Field(None, ge=1, le=20, description="Number of relevant chunks to retrieve (default depends on RAG_PROFILE)")
     use_conversation: bool = Field(False, description="Use conversational chain with memory")
     chat_history: Optional[List[tuple]] = Field(None, description="Previous conversation history")
 
@@ -156,8 +156,7 @@ async def get_job_vector_stats(
     
     # Get collection stats from LangChain service
     try:
-        collection = langchain_rag_service.vectorstore._collection
-        total_chunks = collection.count()
+        total_chunks = langchain_rag_service.get_collection_count()
         
         collection_stats = {
             "collection_name": langchain_rag_service.collection_name,
@@ -188,8 +187,7 @@ async def get_vector_store_stats(
     Returns information about the entire ChromaDB collection (via LangChain).
     """
     try:
-        collection = langchain_rag_service.vectorstore._collection
-        total_chunks = collection.count()
+        total_chunks = langchain_rag_service.get_collection_count()
         
         return {
             "collection_name": langchain_rag_service.collection_name,
@@ -1,15 +1,16 @@
 """
 Resume management routes: upload, list, get, delete.
 """
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 from uuid import UUID
 
 from fastapi import (
     APIRouter, Depends, HTTPException, status, 
     UploadFile, File, Query
 )
-from fastapi.responses import StreamingResponse
-from sqlalchemy import select, desc
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy import select, desc, exists
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -19,14 +20,73 @@ from app.schemas import (
     Resume as ResumeSchema, 
     ResumeList, 
     ResumeWithData,
-    FileUploadResponse
+    FileUploadResponse,
+    ParsingStatus,
+    RESUME_LIST_ADAPTER
 )
 from app.api.deps import get_current_user
+from app.core.cache import invalidate_job_resumes, resume_list_cache
 from app.services.file_storage import file_storage
-import io
+from app.services.rag_langchain import langchain_rag_service
 
 router = APIRouter()
 
+# Download content types by stored file_type
+_MEDIA_TYPES: dict[str, str] = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+# Only the columns ResumeList needs (skips file_path etc. and ORM hydration)
+_RESUME_LIST_COLUMNS = tuple(getattr(Resume, name) for name in ResumeList.model_fields)
+
+
+async def _find_duplicate(
+    db: AsyncSession,
+    job_id: UUID,
+    content_sha256: str
+) -> Optional[FileUploadResponse]:
+    """
+    Look up a resume with the same content already uploaded to a job.
+    
+    Args:
+        db: Database session
+        job_id: Job ID
+        content_sha256: SHA-256 of the uploaded file
+        
+    Returns:
+        Upload response pointing at the existing resume, or None
+    """
+    result = await db.execute(
+        select(Resume.id, Resume.file_name, Resume.file_size)
+        .where(Resume.job_id == job_id, Resume.content_sha256 == content_sha256)
+    )
+    existing = result.one_or_none()
+    
+    if existing is None:
+        return None
+    
+    return FileUploadResponse(
+        message="Resume already uploaded for this job",
+        resume_id=existing.id,
+        file_name=existing.file_name,
+        file_size=existing.file_size,
+        status="duplicate"
+    )
+
+
+async def _ensure_job_owned(db: AsyncSession, job_id: UUID, current_user: User) -> None:
+    """Raise 404 unless the job exists and belongs to the current user."""
+    job_owned = await db.scalar(
+        select(exists().where(Job.id == job_id, Job.user_id == current_user.id))
+    )
+    
+    if not job_owned:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
 
 @router.post("/{job_id}/resumes", response_model=FileUploadResponse, status_code=status.HTTP_201_CREATED)
 async def upload_resume(
@@ -44,22 +104,13 @@ async def upload_resume(
     Returns upload confirmation with resume ID.
     """
     # Verify job exists and user owns it
-    result = await db.execute(
-        select(Job).where(Job.id == job_id)
-    )
-    job = result.scalar_one_or_none()
-    
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
+    await _ensure_job_owned(db, job_id, current_user)
     
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to upload resumes to this job"
-        )
+    # Identical file already uploaded to this job: skip storage and parsing
+    content_sha256 = await file_storage.hash_upload(file)
+    duplicate = await _find_duplicate(db, job_id, content_sha256)
+    if duplicate:
+        return duplicate
     
     # Save file to storage
     file_info = await file_storage.save_file(file, str(job_id))
@@ -71,13 +122,23 @@ async def upload_resume(
         file_path=file_info["file_path"],
         file_size=file_info["file_size"],
         file_type=file_info["file_type"],
+        content_sha256=content_sha256,
         upload_status="uploaded",
         parsing_status="pending"
     )
     
     db.add(new_resume)
-    await db.commit()
-    await db.refresh(new_resume)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same file won the unique constraint
+        await db.rollback()
+        await file_storage.delete_file(file_info["file_path"])
+        duplicate = await _find_duplicate(db, job_id, content_sha256)
+        if duplicate:
+            return duplicate
+        raise
+    invalidate_job_resumes(job_id)
     
     return FileUploadResponse(
         message="Resume uploaded successfully",
@@ -93,7 +154,7 @@ async def list_resumes(
     job_id: UUID,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)],
-    parsing_status: str | None = Query(None, description="Filter by parsing status"),
+    parsing_status: ParsingStatus | None = Query(None, description="Filter by parsing status"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100)
 ):
@@ -107,34 +168,20 @@ async def list_resumes(
     
     Returns resumes ordered by score (highest first), then by upload date.
     """
-    # Verify job exists and user owns it
-    result = await db.execute(
-        select(Job).where(Job.id == job_id)
+    cache_key = f"{job_id}:{current_user.id}:{parsing_status}:{skip}:{limit}"
+    cached = resume_list_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    # Build query, scoped to jobs owned by the current user
+    query = (
+        select(*_RESUME_LIST_COLUMNS)
+        .join(Resume.job)
+        .where(Resume.job_id == job_id, Job.user_id == current_user.id)
     )
-    job = result.scalar_one_or_none()
-    
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
-    
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this job's resumes"
-        )
-    
-    # Build query
-    query = select(Resume).where(Resume.job_id == job_id)
     
     # Apply parsing status filter if provided
     if parsing_status:
-        if parsing_status not in ["pending", "processing", "completed", "failed"]:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid parsing status"
-            )
         query = query.where(Resume.parsing_status == parsing_status)
     
     # Order by score (desc, nulls last) then by created_at (desc)
@@ -145,9 +192,19 @@ async def list_resumes(
     
     # Execute query
     result = await db.execute(query)
-    resumes = result.scalars().all()
+    # Rows come straight from the typed columns, so skip re-validation
+    resumes = [ResumeList.model_construct(**row._mapping) for row in result.all()]
     
-    return resumes
+    # No rows: tell a job without (matching) resumes apart from a missing or
+    # unowned job. Only checked results are cached, so cache hits skip this.
+    if not resumes:
+        await _ensure_job_owned(db, job_id, current_user)
+    
+    # Serialize once; the cached JSON is served as-is on hits
+    content = RESUME_LIST_ADAPTER.dump_json(resumes)
+    resume_list_cache.set(cache_key, content)
+    
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/resumes/{resume_id}", response_model=ResumeWithData)
@@ -161,11 +218,12 @@ async def get_resume(
     
     Returns resume with parsed data if available.
     """
-    # Get resume with job and parsed data
+    # Get resume with parsed data, scoped to jobs owned by the current user
     result = await db.execute(
         select(Resume)
-        .options(selectinload(Resume.job), selectinload(Resume.resume_data))
-        .where(Resume.id == resume_id)
+        .join(Resume.job)
+        .options(selectinload(Resume.resume_data))
+        .where(Resume.id == resume_id, Job.user_id == current_user.id)
     )
     resume = result.scalar_one_or_none()
     
@@ -175,13 +233,6 @@ async def get_resume(
             detail="Resume not found"
         )
     
-    # Check ownership
-    if resume.job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this resume"
-        )
-    
     return resume
 
 
@@ -196,11 +247,11 @@ async def download_resume(
     
     Returns the file as a downloadable attachment.
     """
-    # Get resume with job
+    # Get resume, scoped to jobs owned by the current user
     result = await db.execute(
         select(Resume)
-        .options(selectinload(Resume.job))
-        .where(Resume.id == resume_id)
+        .join(Resume.job)
+        .where(Resume.id == resume_id, Job.user_id == current_user.id)
     )
     resume = result.scalar_one_or_none()
     
@@ -210,22 +261,20 @@ async def download_resume(
             detail="Resume not found"
         )
     
-    # Check ownership
-    if resume.job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to download this resume"
-        )
-    
-    # Get file from storage
-    file_content = await file_storage.get_file(resume.file_path)
-    
     # Determine media type
-    media_type = "application/pdf" if resume.file_type == "pdf" else "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    media_type = _MEDIA_TYPES.get(resume.file_type, "application/octet-stream")
+    
+    # Local files are sent straight from disk (sendfile); S3 objects are
+    # streamed in chunks instead of being read into memory first
+    if not file_storage.use_s3:
+        return FileResponse(
+            file_storage.get_local_path(resume.file_path),
+            media_type=media_type,
+            filename=resume.file_name
+        )
     
-    # Return file as streaming response
     return StreamingResponse(
-        io.BytesIO(file_content),
+        await file_storage.iter_file(resume.file_path),
         media_type=media_type,
         headers={
             "Content-Disposition": f'attachment; filename="{resume.file_name}"'
@@ -242,13 +291,14 @@ async def delete_resume(
     """
     Delete a resume.
     
-    Deletes both the database record and the file from storage.
+    Deletes the database record, the file from storage and the resume's
+    vector chunks.
     """
-    # Get resume with job
+    # Get resume, scoped to jobs owned by the current user
     result = await db.execute(
         select(Resume)
-        .options(selectinload(Resume.job))
-        .where(Resume.id == resume_id)
+        .join(Resume.job)
+        .where(Resume.id == resume_id, Job.user_id == current_user.id)
     )
     resume = result.scalar_one_or_none()
     
@@ -258,18 +308,16 @@ async def delete_resume(
             detail="Resume not found"
         )
     
-    # Check ownership
-    if resume.job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this resume"
-        )
-    
     # Delete file from storage
     await file_storage.delete_file(resume.file_path)
     
+    # Delete vector chunks (by ID when the chunk count is known, else by a
+    # metadata scan, e.g. for legacy rows or partly failed embedding runs)
+    await langchain_rag_service.delete_documents(resume.id, resume.num_chunks)
+    
     # Delete from database (cascades to resume_data and embeddings)
     await db.delete(resume)
     await db.commit()
+    invalidate_job_resumes(resume.job_id)
     
     return None
\ No newline at end of file
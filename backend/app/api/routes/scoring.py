@@ -2,122 +2,202 @@
 Resume scoring routes: Calculate and update resume scores.
 """
 import logging
-from typing import Annotated
+from typing import Annotated, Any, Dict
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy import select, update
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import exists, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db
 from app.models import Resume, Job, User, ResumeData
 from app.api.deps import get_current_user
+from app.core.cache import invalidate_job_resumes, leaderboard_cache
 from app.services.scoring import scoring_service
+from app.services.task_queue import scoring_queue
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-async def score_resume_background(resume_id: UUID, job_id: UUID, db: AsyncSession):
+def _resume_scoring_data(resume_data: ResumeData) -> Dict[str, Any]:
+    """Build the scoring service input from parsed resume data."""
+    return {
+        'skills': resume_data.skills,
+        'skills_normalized': resume_data.skills_normalized,
+        'experience': resume_data.experience,
+        'education': resume_data.education,
+        'total_experience_years': resume_data.total_experience_years,
+        'summary': resume_data.summary
+    }
+
+
+def _job_scoring_data(job: Job) -> Dict[str, Any]:
+    """Build the scoring service input from a job."""
+    return {
+        'title': job.title,
+        'description': job.description,
+        'requirements': job.requirements or '',
+        'experience_level': job.experience_level or ''
+    }
+
+
+async def score_resume_background(resume_id: UUID, job_id: UUID):
     """
     Background task to score a resume.
     
+    Opens its own database sessions: the request-scoped session is closed
+    by the time background tasks run. Inputs are read in one short session
+    and the score is written with a single UPDATE in another, so no
+    connection is held while the embedding API is called.
+    
     Args:
         resume_id: Resume ID to score
         job_id: Job ID for comparison
-        db: Database session
     """
     try:
-        # Get resume with parsed data
-        result = await db.execute(
-            select(Resume)
-            .options(selectinload(Resume.resume_data))
-            .where(Resume.id == resume_id)
-        )
-        resume = result.scalar_one_or_none()
+        async with AsyncSessionLocal() as db:
+            # Get parsed data for the resume
+            result = await db.execute(
+                select(ResumeData).where(ResumeData.resume_id == resume_id)
+            )
+            resume_data = result.scalar_one_or_none()
         
-        if not resume or not resume.resume_data:
-            logger.error(f"Resume {resume_id} not found or not parsed")
-            return
+            if not resume_data:
+                logger.error(f"Resume {resume_id} not found or not parsed")
+                return
         
-        # Get job
-        result = await db.execute(
-            select(Job).where(Job.id == job_id)
-        )
-        job = result.scalar_one_or_none()
+            # Get job
+            result = await db.execute(
+                select(Job).where(Job.id == job_id)
+            )
+            job = result.scalar_one_or_none()
         
-        if not job:
-            logger.error(f"Job {job_id} not found")
-            return
+            if not job:
+                logger.error(f"Job {job_id} not found")
+                return
         
         logger.info(f"Scoring resume {resume_id} for job {job_id}")
         
-        # Prepare resume data for scoring
-        resume_data = {
-            'skills': resume.resume_data.skills,
-            'experience': resume.resume_data.experience,
-            'education': resume.resume_data.education,
-            'total_experience_years': resume.resume_data.total_experience_years,
-            'summary': resume.resume_data.summary
-        }
-        
-        # Prepare job data for scoring
-        job_data = {
-            'title': job.title,
-            'description': job.description,
-            'requirements': job.requirements or '',
-            'experience_level': job.experience_level or ''
-        }
-        
         # Calculate score
-        score = await scoring_service.score_resume(resume_data, job_data)
+        score = await scoring_service.score_resume(
+            _resume_scoring_data(resume_data),
+            _job_scoring_data(job)
+        )
         
         # Update resume with score
-        resume.score = score
-        await db.commit()
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Resume)
+                .where(Resume.id == resume_id)
+                .values(score=score)
+            )
+            await db.commit()
+        invalidate_job_resumes(job_id)
         
         logger.info(f"Resume {resume_id} scored: {score}")
-        
+    
     except Exception as e:
         logger.error(f"Failed to score resume {resume_id}: {str(e)}")
 
 
-async def rank_resumes_for_job(job_id: UUID, db: AsyncSession):
+async def score_all_background(job_id: UUID):
     """
-    Update rank for all scored resumes in a job.
+    Background task to score every parsed resume for a job, then rank them.
+    
+    Loads the job and all parsed data in one pass, scores the resumes in one
+    batch (scoring is dominated by embedding API latency) and writes all
+    scores back in one executemany UPDATE. If scoring fails (e.g. embeddings
+    can't be generated) no scores are written, leaving the resumes unscored.
     
     Args:
         job_id: Job ID
-        db: Database session
     """
     try:
-        # Get all scored resumes for this job, ordered by score
-        result = await db.execute(
-            select(Resume)
-            .where(
-                Resume.job_id == job_id,
-                Resume.score.isnot(None)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Job).where(Job.id == job_id))
+            job = result.scalar_one_or_none()
+            
+            if not job:
+                logger.error(f"Job {job_id} not found")
+                return
+            
+            result = await db.execute(
+                select(ResumeData)
+                .join(ResumeData.resume)
+                .where(
+                    Resume.job_id == job_id,
+                    Resume.parsing_status == "completed"
+                )
             )
-            .order_by(Resume.score.desc())
+            parsed = result.scalars().all()
+        
+        # Score all resumes together (job and resume summaries are
+        # embedded in batched requests)
+        values = await scoring_service.score_resumes(
+            [_resume_scoring_data(resume_data) for resume_data in parsed],
+            _job_scoring_data(job)
         )
-        resumes = result.scalars().all()
+        scores = [
+            {"id": resume_data.resume_id, "score": score}
+            for resume_data, score in zip(parsed, values)
+        ]
         
-        # Update ranks
-        for rank, resume in enumerate(resumes, start=1):
-            resume.rank = rank
+        if scores:
+            async with AsyncSessionLocal() as db:
+                # Bulk UPDATE by primary key (one executemany round-trip)
+                await db.execute(update(Resume), scores)
+                await db.commit()
+        logger.info(f"Scored {len(scores)} resumes for job {job_id}")
+    
+    except Exception as e:
+        logger.error(f"Failed to score resumes for job {job_id}: {str(e)}")
+        return
+    
+    await rank_resumes_for_job(job_id)
+
+
+async def rank_resumes_for_job(job_id: UUID):
+    """
+    Update rank for all scored resumes in a job.
+    
+    Args:
+        job_id: Job ID
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            # Rank scored resumes in the database with a single
+            # UPDATE ... FROM (SELECT row_number() OVER (ORDER BY score DESC))
+            ranked = (
+                select(
+                    Resume.id,
+                    func.row_number().over(order_by=Resume.score.desc()).label("position")
+                )
+                .where(
+                    Resume.job_id == job_id,
+                    Resume.score.isnot(None)
+                )
+                .subquery()
+            )
+            result = await db.execute(
+                update(Resume)
+                .where(Resume.id == ranked.c.id)
+                .values(rank=ranked.c.position)
+                .execution_options(synchronize_session=False)
+            )
         
-        await db.commit()
-        logger.info(f"Updated ranks for {len(resumes)} resumes in job {job_id}")
+            await db.commit()
+            invalidate_job_resumes(job_id)
+            logger.info(f"Updated ranks for {result.rowcount} resumes in job {job_id}")
         
-    except Exception as e:
-        logger.error(f"Failed to rank resumes for job {job_id}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to rank resumes for job {job_id}: {str(e)}")
 
 
 @router.post("/resumes/{resume_id}/score", response_model=dict)
 async def score_single_resume(
     resume_id: UUID,
-    background_tasks: BackgroundTasks,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
@@ -128,14 +208,12 @@ async def score_single_resume(
     
     Requires the resume to be parsed first.
     """
-    # Get resume with job and parsed data
+    # Get resume with parsed data, scoped to jobs owned by the current user
     result = await db.execute(
         select(Resume)
-        .options(
-            selectinload(Resume.job),
-            selectinload(Resume.resume_data)
-        )
-        .where(Resume.id == resume_id)
+        .join(Resume.job)
+        .options(selectinload(Resume.resume_data))
+        .where(Resume.id == resume_id, Job.user_id == current_user.id)
     )
     resume = result.scalar_one_or_none()
     
@@ -145,13 +223,6 @@ async def score_single_resume(
             detail="Resume not found"
         )
     
-    # Check ownership
-    if resume.job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to score this resume"
-        )
-    
     # Check if parsed
     if resume.parsing_status != "completed" or not resume.resume_data:
         raise HTTPException(
@@ -159,13 +230,8 @@ async def score_single_resume(
             detail="Resume must be parsed before scoring"
         )
     
-    # Add to background tasks
-    background_tasks.add_task(
-        score_resume_background,
-        resume_id,
-        resume.job_id,
-        db
-    )
+    # Queue scoring (runs concurrently with other scoring tasks)
+    scoring_queue.submit(score_resume_background, resume_id, resume.job_id)
     
     return {
         "message": "Resume scoring started",
@@ -176,7 +242,6 @@ async def score_single_resume(
 @router.post("/jobs/{job_id}/score-all", response_model=dict)
 async def score_all_resumes(
     job_id: UUID,
-    background_tasks: BackgroundTasks,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
@@ -187,63 +252,34 @@ async def score_all_resumes(
     
     Scores all resumes with parsing_status='completed' and updates their ranks.
     """
-    # Verify job exists and user owns it
-    result = await db.execute(
-        select(Job).where(Job.id == job_id)
-    )
-    job = result.scalar_one_or_none()
-    
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
-    
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to score resumes for this job"
-        )
-    
-    # Get all parsed resumes without scores
-    result = await db.execute(
-        select(Resume)
-        .options(selectinload(Resume.resume_data))
+    # Count parsed resumes, scoped to jobs owned by the current user
+    # (count(*) in the database instead of loading every ID)
+    parsed_count = await db.scalar(
+        select(func.count())
+        .select_from(Resume)
+        .join(Resume.job)
         .where(
             Resume.job_id == job_id,
+            Job.user_id == current_user.id,
             Resume.parsing_status == "completed",
             Resume.resume_data.has()  # Has parsed data
         )
     )
-    parsed_resumes = result.scalars().all()
     
-    if not parsed_resumes:
+    if not parsed_count:
         return {
             "message": "No parsed resumes to score",
             "job_id": str(job_id),
             "count": 0
         }
     
-    # Add scoring tasks
-    for resume in parsed_resumes:
-        background_tasks.add_task(
-            score_resume_background,
-            resume.id,
-            job_id,
-            db
-        )
-    
-    # Add ranking task (will run after scoring completes)
-    background_tasks.add_task(
-        rank_resumes_for_job,
-        job_id,
-        db
-    )
+    # Score everything in one task (ranks are updated when it finishes)
+    scoring_queue.submit(score_all_background, job_id)
     
     return {
-        "message": f"Scoring started for {len(parsed_resumes)} resumes",
+        "message": f"Scoring started for {parsed_count} resumes",
         "job_id": str(job_id),
-        "count": len(parsed_resumes)
+        "count": parsed_count
     }
 
 
@@ -262,45 +298,55 @@ async def get_job_leaderboard(
     
     Returns resumes ordered by score (highest first).
     """
-    # Verify job exists and user owns it
-    result = await db.execute(
-        select(Job).where(Job.id == job_id)
-    )
-    job = result.scalar_one_or_none()
+    cache_key = f"{job_id}:{current_user.id}:{limit}"
+    cached = leaderboard_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
-    if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Job not found"
-        )
-    
-    if job.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this job's leaderboard"
-        )
-    
-    # Get top resumes
+    # Get top resumes, scoped to jobs owned by the current user
+    # (only the columns the response needs, as plain rows)
     result = await db.execute(
-        select(Resume)
+        select(
+            Resume.id,
+            Resume.candidate_name,
+            Resume.score,
+            Resume.rank,
+            Resume.file_name
+        )
+        .join(Resume.job)
         .where(
             Resume.job_id == job_id,
+            Job.user_id == current_user.id,
             Resume.score.isnot(None)
         )
-        .order_by(Resume.score.desc())
+        .order_by(Resume.score.desc().nulls_last())  # matches ix_resumes_job_score
         .limit(limit)
     )
-    top_resumes = result.scalars().all()
     
     # Format response
-    leaderboard = []
-    for resume in top_resumes:
-        leaderboard.append({
-            "resume_id": str(resume.id),
-            "candidate_name": resume.candidate_name,
-            "score": resume.score,
-            "rank": resume.rank,
-            "file_name": resume.file_name
-        })
+    leaderboard = [
+        {
+            "resume_id": str(row.id),
+            "candidate_name": row.candidate_name,
+            "score": row.score,
+            "rank": row.rank,
+            "file_name": row.file_name
+        }
+        for row in result.all()
+    ]
+    
+    # No rows: tell a job without scored resumes apart from a missing or
+    # unowned job. Only checked results are cached, so cache hits skip this.
+    if not leaderboard:
+        job_owned = await db.scalar(
+            select(exists().where(Job.id == job_id, Job.user_id == current_user.id))
+        )
+        
+        if not job_owned:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
     
+    leaderboard_cache.set(cache_key, leaderboard)
     return leaderboard
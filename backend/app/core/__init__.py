@@ -2,9 +2,13 @@
 Core utilities package.
 """
 from app.core.config import settings
+from app.core.ids import uuid7
 from app.core.security import (
     verify_password,
+    verify_and_update_password,
+    averify_and_update_password,
     get_password_hash,
+    aget_password_hash,
     create_access_token,
     decode_access_token,
 )
@@ -13,16 +17,24 @@ from app.core.llm_instances import (
     get_embeddings,
     get_parsing_llm,
     get_openai_client,
+    get_http_client,
+    openai_semaphore,
 )
 
 __all__ = [
     "settings",
+    "uuid7",
     "verify_password",
+    "verify_and_update_password",
+    "averify_and_update_password",
     "get_password_hash",
+    "aget_password_hash",
     "create_access_token",
     "decode_access_token",
     "get_llm",
     "get_embeddings",
     "get_parsing_llm",
     "get_openai_client",
+    "get_http_client",
+    "openai_semaphore",
 ]
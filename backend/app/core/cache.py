@@ -0,0 +1,102 @@
+"""
+Small in-process caches.
+
+Process-local by design: the app runs as a single worker and there is no
+shared cache infrastructure (Redis) in the deployment yet.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after a fixed time-to-live.
+
+    Not thread-safe; intended for use from the event loop only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries before the least recently used is evicted
+            ttl: Seconds an entry stays valid (None: never expires)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key
+            default: Returned when the key is missing or expired
+
+        Returns:
+            Cached value or default
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at and expires_at < time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0.0
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Remove every string key starting with prefix."""
+        for key in [k for k in self._data if isinstance(k, str) and k.startswith(prefix)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Read-through caches for per-job resume listings (keys start with "{job_id}:")
+leaderboard_cache = TTLCache(maxsize=256, ttl=15)
+resume_list_cache = TTLCache(maxsize=512, ttl=5)
+
+
+def invalidate_job_resumes(job_id: Hashable) -> None:
+    """
+    Drop cached resume listings and leaderboards for a job.
+
+    Call after resumes of the job are added, deleted, re-parsed or re-scored.
+
+    Args:
+        job_id: Job ID
+    """
+    prefix = f"{job_id}:"
+    leaderboard_cache.delete_prefix(prefix)
+    resume_list_cache.delete_prefix(prefix)
@@ -1,7 +1,8 @@
 """
 Application configuration using Pydantic settings.
 """
-from typing import List
+from functools import cached_property
+from typing import Literal, Optional, Tuple
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import field_validator
 
@@ -20,6 +21,10 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 40
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a pooled connection is replaced
+    DB_STATEMENT_CACHE_SIZE: int = 1024  # Prepared statements cached per connection
     
     # Security
     SECRET_KEY: str
@@ -29,6 +34,7 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4o-mini"  # Fast and cost-effective
+    OPENAI_MAX_CONCURRENCY: int = 16  # OpenAI requests in flight per process (size to the account's rate limits)
 
     # AWS S3
     AWS_ACCESS_KEY_ID: str = ""
@@ -39,9 +45,28 @@ class Settings(BaseSettings):
     # Vector Store
     VECTOR_STORE_PATH: str = "./vector_store"
     EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    # Shortened embedding size (text-embedding-3-* only), e.g. 512 with
+    # text-embedding-3-small: 3x smaller vectors for HNSW. None: model default.
+    EMBEDDING_DIMENSIONS: Optional[int] = None
+    # RAG retrieval profile: HNSW graph settings and default top_k
+    # (speed: fewer hops and chunks, recall: wider search)
+    RAG_PROFILE: Literal["speed", "balanced", "recall"] = "balanced"
+    
+    # Scoring: skip the embeddings call for resume/job pairs whose skills and
+    # experience already decide the outcome (semantic adds 0-25 points).
+    # Opt-in: skipped pairs get a fixed semantic score, so stored scores and
+    # ranks change (see docs/DECISIONS.md).
+    SCORING_REJECT_THRESHOLD: float = 0.0  # Max possible score below this: scored without semantic (0 disables)
+    SCORING_ACCEPT_THRESHOLD: float = 100.0  # Score without semantic above this: semantic midpoint (>= 75 disables)
+    # Cosine similarity at which a resume skill counts as a synonym of a job
+    # skill ("k8s" / "kubernetes"). None disables. Suits text-embedding-3-*
+    # (around 0.85); ada-002 rates unrelated short strings similarly high.
+    SKILL_SYNONYM_SIMILARITY: Optional[float] = None
     
     # File Upload
     MAX_UPLOAD_SIZE: int = 5242880  # 5MB in bytes
+    PARSE_CACHE_PATH: str = "./parse_cache"  # Parsed resume JSON keyed by text hash ("" disables)
+    PARSE_CACHE_TTL_DAYS: int = 7  # Older entries are re-parsed, and pruned at startup
     ALLOWED_EXTENSIONS: str = "pdf,docx"
     
     # CORS
@@ -64,15 +89,15 @@ class Settings(BaseSettings):
             return v.replace("postgresql://", "postgresql+asyncpg://", 1)
         return v
     
-    @property
-    def cors_origins_list(self) -> List[str]:
-        """Parse CORS origins string into list."""
-        return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
+    @cached_property
+    def cors_origins_list(self) -> Tuple[str, ...]:
+        """Parse CORS origins string into a tuple (computed once)."""
+        return tuple(origin.strip() for origin in self.CORS_ORIGINS.split(","))
     
-    @property
-    def allowed_extensions_list(self) -> List[str]:
-        """Parse allowed extensions string into list."""
-        return [ext.strip() for ext in self.ALLOWED_EXTENSIONS.split(",")]
+    @cached_property
+    def allowed_extensions_list(self) -> Tuple[str, ...]:
+        """Parse allowed extensions string into a tuple (computed once)."""
+        return tuple(ext.strip() for ext in self.ALLOWED_EXTENSIONS.split(","))
 
 
 # Global settings instance
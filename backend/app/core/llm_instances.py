@@ -2,13 +2,37 @@
 Singleton instances for LLM and Embeddings.
 Prevents re-initialization and improves performance.
 """
+import asyncio
 from functools import lru_cache
 
+import httpx
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from openai import AsyncOpenAI
 
 from app.core.config import settings
 
+# Shared limit on concurrent OpenAI requests, so bursts queue here instead of
+# hitting rate limits (429s) and the SDK's exponential backoff
+openai_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client for OpenAI requests.
+    
+    One pooled HTTP/2 client is reused by the raw OpenAI client and the
+    LangChain wrappers, so concurrent calls share warm connections instead
+    of each paying for a TCP/TLS handshake.
+    
+    Returns:
+        httpx.AsyncClient instance
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    )
+
 
 @lru_cache(maxsize=1)
 def get_embeddings() -> OpenAIEmbeddings:
@@ -22,7 +46,9 @@ def get_embeddings() -> OpenAIEmbeddings:
     """
     return OpenAIEmbeddings(
         model=settings.EMBEDDING_MODEL,
-        api_key=settings.OPENAI_API_KEY
+        dimensions=settings.EMBEDDING_DIMENSIONS,
+        api_key=settings.OPENAI_API_KEY,
+        http_async_client=get_http_client()
     )
 
 
@@ -42,7 +68,8 @@ def get_llm(temperature: float = 0.3) -> ChatOpenAI:
     return ChatOpenAI(
         model=settings.OPENAI_MODEL,
         temperature=temperature,
-        api_key=settings.OPENAI_API_KEY
+        api_key=settings.OPENAI_API_KEY,
+        http_async_client=get_http_client()
     )
 
 
@@ -59,7 +86,8 @@ def get_parsing_llm() -> ChatOpenAI:
     return ChatOpenAI(
         model=settings.OPENAI_MODEL,
         temperature=0.1,  # Very low for structured extraction
-        api_key=settings.OPENAI_API_KEY
+        api_key=settings.OPENAI_API_KEY,
+        http_async_client=get_http_client()
     )
 
 
@@ -74,4 +102,4 @@ def get_openai_client() -> AsyncOpenAI:
     Returns:
         AsyncOpenAI instance
     """
-    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    return AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=get_http_client())
@@ -1,44 +1,105 @@
 """
 Security utilities: password hashing, JWT tokens.
 """
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import hashlib
-from typing import Any, Optional
+import hmac
+import json
+import os
+from typing import Any, Optional, Tuple
 from uuid import UUID
 
-from jose import jwt, JWTError
+from jose import jwk, jwt, JWTError
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.schemas.auth import TokenPayload
 
 # Password hashing context
 # pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto") # max 72 bytes kind of error
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Argon2id with OWASP-recommended cost (64 MiB, 3 passes, 2 lanes). Hashes made
+# with older parameters are upgraded on the next successful login.
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__memory_cost=65536,
+    argon2__time_cost=3,
+    argon2__parallelism=2,
+    argon2__digest_size=32,
+    argon2__salt_size=16,
+)
 
+# Configured Argon2 handler, resolved once. Plain hash/verify calls go to it
+# directly; pwd_context is kept for verify_and_update (rehash detection).
+_argon2 = pwd_context.handler()
 
 
-def _normalize_password(password: str) -> str:
-    # optional but safe: protects against unicode edge cases
+def _legacy_prehash(password: str) -> str:
+    """SHA-256 pre-hash applied to passwords hashed before it was dropped."""
     return hashlib.sha256(password.encode("utf-8")).hexdigest()
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def verify_password(plain_password: str, hashed_password: Optional[str]) -> bool:
     """
     Verify a plain password against a hashed password.
     
+    Pass hashed_password=None when no user was found: the password is then
+    checked against a dummy hash, so a missing account takes as long to
+    reject as a wrong password and emails cannot be enumerated by timing.
+    
     Args:
         plain_password: Password to verify
-        hashed_password: Hashed password from database
+        hashed_password: Hashed password from database (None if no such user)
         
     Returns:
         True if password matches, False otherwise
     """
-    return pwd_context.verify(_normalize_password(plain_password), hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: Optional[str],
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and report whether its hash should be upgraded.
+    
+    Hashes created while passwords were SHA-256 pre-hashed still verify
+    and are reported for replacement. That fallback costs a second Argon2
+    check on a mismatch, so the dummy-hash path does the same two checks
+    to keep rejections equally slow.
+    
+    Args:
+        plain_password: Password to verify
+        hashed_password: Hashed password from database (None if no such user)
+        
+    Returns:
+        (matches, new_hash) where new_hash is set only if the stored hash
+        is legacy or uses outdated parameters and should be replaced
+    """
+    if hashed_password is None:
+        _argon2.verify(plain_password, _DUMMY_HASH)
+        _argon2.verify(_legacy_prehash(plain_password), _DUMMY_HASH)
+        return False, None
+    
+    matches, new_hash = pwd_context.verify_and_update(plain_password, hashed_password)
+    if matches:
+        return True, new_hash
+    
+    # Legacy scheme: sha256(password) fed to Argon2
+    if _argon2.verify(_legacy_prehash(plain_password), hashed_password):
+        return True, _argon2.hash(plain_password)
+    
+    return False, None
 
 
 def get_password_hash(password: str) -> str:
     """
-    Hash a password using bcrypt.
+    Hash a password using Argon2id.
     
     Args:
         password: Plain text password
@@ -46,7 +107,64 @@ def get_password_hash(password: str) -> str:
     Returns:
         Hashed password
     """
-    return pwd_context.hash(_normalize_password(password))
+    return _argon2.hash(password)
+
+
+# Hash compared against when a login targets a non-existent account
+_DUMMY_HASH = get_password_hash("x" * 12)
+
+# Dedicated pool for Argon2 (argon2-cffi releases the GIL), kept separate
+# from the default executor so hashing can't starve other to_thread users
+_hash_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="password-hash",
+)
+
+
+async def averify_and_update_password(
+    plain_password: str,
+    hashed_password: Optional[str],
+) -> Tuple[bool, Optional[str]]:
+    """Async verify_and_update_password: runs Argon2 off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def aget_password_hash(password: str) -> str:
+    """Async get_password_hash: runs Argon2 off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+
+# JWT signing/verification key, constructed once instead of on every call
+_jwt_key = jwk.construct(settings.SECRET_KEY, settings.ALGORITHM)
+
+# HS256 tokens are signed without jose: the header never changes, so it is
+# encoded once and only the claims are serialized per token
+_HS256_SECRET = settings.SECRET_KEY.encode("utf-8")
+_HS256_HEADER = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+
+def _encode_hs256(claims: dict[str, Any]) -> str:
+    """
+    Encode and sign JWT claims with HS256.
+    
+    Args:
+        claims: JSON-serializable claims
+        
+    Returns:
+        Encoded JWT token
+    """
+    payload = base64.urlsafe_b64encode(
+        json.dumps(claims, separators=(",", ":")).encode("utf-8")
+    ).rstrip(b"=")
+    signing_input = _HS256_HEADER + b"." + payload
+    signature = base64.urlsafe_b64encode(
+        hmac.new(_HS256_SECRET, signing_input, hashlib.sha256).digest()
+    ).rstrip(b"=")
+    return (signing_input + b"." + signature).decode("ascii")
 
 
 def create_access_token(subject: str | UUID, expires_delta: Optional[timedelta] = None) -> str:
@@ -66,20 +184,23 @@ def create_access_token(subject: str | UUID, expires_delta: Optional[timedelta]
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode = {
-        "exp": expire,
-        "sub": str(subject)  # Convert UUID to string
+        "exp": int(expire.timestamp()),
+        "sub": subject if isinstance(subject, str) else str(subject)  # Convert UUID to string
     }
     
+    if settings.ALGORITHM == "HS256":
+        return _encode_hs256(to_encode)
+    
     encoded_jwt = jwt.encode(
         to_encode, 
-        settings.SECRET_KEY, 
+        _jwt_key, 
         algorithm=settings.ALGORITHM
     )
     
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[dict[str, Any]]:
+def decode_access_token(token: str) -> Optional[TokenPayload]:
     """
     Decode and validate a JWT token.
     
@@ -92,9 +213,15 @@ def decode_access_token(token: str) -> Optional[dict[str, Any]]:
     try:
         payload = jwt.decode(
             token, 
-            settings.SECRET_KEY, 
+            _jwt_key, 
             algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+    
+    # Signature and expiry are verified; only the claim shape is left to check
+    sub = payload.get("sub")
+    exp = payload.get("exp")
+    if not isinstance(sub, str) or not isinstance(exp, int):
+        return None
+    return TokenPayload(sub=sub, exp=exp)
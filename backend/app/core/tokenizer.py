@@ -0,0 +1,66 @@
+"""
+Token counting and truncation for LLM prompts.
+"""
+from functools import lru_cache
+
+import tiktoken
+
+from app.core.config import settings
+
+# Used when tiktoken doesn't know the model name
+_FALLBACK_ENCODING = "o200k_base"
+
+# Upper bound on characters per token, used to pre-trim very long texts so
+# we never tokenize far more than can be kept
+_MAX_CHARS_PER_TOKEN = 8
+
+
+@lru_cache(maxsize=8)
+def get_encoding(model: str = settings.OPENAI_MODEL) -> tiktoken.Encoding:
+    """
+    Get cached tiktoken encoding for a model.
+    
+    Args:
+        model: OpenAI model name
+        
+    Returns:
+        tiktoken Encoding
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(_FALLBACK_ENCODING)
+
+
+def count_tokens(text: str, model: str = settings.OPENAI_MODEL) -> int:
+    """
+    Count the tokens in text for a model.
+    
+    Args:
+        text: Text to count
+        model: OpenAI model name
+        
+    Returns:
+        Number of tokens
+    """
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = settings.OPENAI_MODEL) -> str:
+    """
+    Truncate text to at most max_tokens tokens for a model.
+    
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget
+        model: OpenAI model name
+        
+    Returns:
+        Text unchanged if within budget, otherwise its first max_tokens tokens
+    """
+    text = text[:max_tokens * _MAX_CHARS_PER_TOKEN]
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
@@ -13,8 +13,13 @@ engine = create_async_engine(
     echo=settings.DEBUG,  # Log SQL queries in debug mode
     future=True,
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,  # Recycle connections before server-side idle timeouts
+    connect_args={
+        # Size of the asyncpg dialect's per-connection prepared statement cache
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+    },
 )
 
 # Create async session factory
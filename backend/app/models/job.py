@@ -3,7 +3,7 @@ Job posting model.
 """
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text, CheckConstraint, func
+from sqlalchemy import Column, DateTime, ForeignKey, String, Text, CheckConstraint, Index, desc, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -31,19 +31,35 @@ class Job(Base):
     salary_range = Column(String(100), nullable=True)
     
     # Status
-    status = Column(String(50), default="open", nullable=False, index=True)
+    status = Column(String(50), server_default="open", nullable=False, index=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     owner = relationship("User", back_populates="jobs")
-    resumes = relationship("Resume", back_populates="job", cascade="all, delete-orphan")
+    # Never lazy-loaded (use selectinload); deletes rely on ON DELETE CASCADE
+    resumes = relationship(
+        "Resume",
+        back_populates="job",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql"
+    )
     
     # Constraints
     __table_args__ = (
         CheckConstraint("status IN ('open', 'closed', 'draft')", name="check_job_status"),
+        # Covers list_jobs: WHERE user_id = ? ORDER BY created_at DESC LIMIT ?
+        Index(
+            "ix_jobs_user_created",
+            "user_id",
+            desc("created_at"),
+            postgresql_include=["id", "title", "status", "location", "employment_type"],
+        ),
+        # Index-only ownership checks: WHERE id = ? AND user_id = ?
+        Index("ix_jobs_id_user", "id", "user_id"),
     )
     
     def __repr__(self):
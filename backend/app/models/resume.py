@@ -1,15 +1,17 @@
 """
 Resume model and related tables.
 """
-from uuid import uuid4
+from typing import Any, Dict, List
 
 from sqlalchemy import (
     Column, DateTime, Float, ForeignKey, Integer, 
-    String, Text, CheckConstraint, func
+    String, Text, CheckConstraint, Index, UniqueConstraint,
+    desc, func, insert, nulls_last, text
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 
+from app.core.ids import uuid7
 from app.database import Base
 
 
@@ -19,7 +21,7 @@ class Resume(Base):
     __tablename__ = "resumes"
     
     # Primary Key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # time-ordered for insert locality
     
     # Foreign Key
     job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -33,23 +35,41 @@ class Resume(Base):
     file_path = Column(Text, nullable=False)  # S3 path or local path
     file_size = Column(Integer, nullable=False)
     file_type = Column(String(10), nullable=False)  # pdf, docx
+    content_sha256 = Column(String(64), nullable=True)  # For duplicate detection per job
     
     # Processing Status
-    upload_status = Column(String(50), default="uploaded", nullable=False)
-    parsing_status = Column(String(50), default="pending", nullable=False, index=True)
+    upload_status = Column(String(50), server_default="uploaded", nullable=False)
+    parsing_status = Column(String(50), server_default="pending", nullable=False, index=True)
+    num_chunks = Column(Integer, nullable=True)  # Vector chunks stored as "{id}:{0..n-1}"
     
     # Scoring
     score = Column(Float, nullable=True, index=True)  # 0-100
     rank = Column(Integer, nullable=True)  # Position in ranking
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
+    # resume_data/embeddings must be eager-loaded explicitly (selectinload);
+    # lazy-loading them per row raises instead of silently issuing N+1 queries.
+    # Deletes rely on the ON DELETE CASCADE foreign keys.
     job = relationship("Job", back_populates="resumes")
-    resume_data = relationship("ResumeData", back_populates="resume", uselist=False, cascade="all, delete-orphan")
-    embeddings = relationship("ResumeEmbedding", back_populates="resume", cascade="all, delete-orphan")
+    resume_data = relationship(
+        "ResumeData",
+        back_populates="resume",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql"
+    )
+    embeddings = relationship(
+        "ResumeEmbedding",
+        back_populates="resume",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql"
+    )
     
     # Constraints
     __table_args__ = (
@@ -59,6 +79,23 @@ class Resume(Base):
             name="check_parsing_status"
         ),
         CheckConstraint("score >= 0 AND score <= 100", name="check_score_range"),
+        # Same file can't be uploaded twice to a job (also serves the lookup)
+        UniqueConstraint("job_id", "content_sha256", name="uq_resumes_job_content_sha256"),
+        # Lets get_job_stats aggregate with an index-only scan
+        Index(
+            "ix_resumes_job_status_score",
+            "job_id",
+            "parsing_status",
+            postgresql_include=["score"],
+        ),
+        # Leaderboard / list ordering: WHERE job_id = ? ORDER BY score DESC NULLS LAST
+        Index(
+            "ix_resumes_job_score",
+            "job_id",
+            nulls_last(desc("score")),
+            "parsing_status",
+            postgresql_include=["candidate_name", "rank", "file_name"],
+        ),
     )
     
     def __repr__(self):
@@ -71,7 +108,7 @@ class ResumeData(Base):
     __tablename__ = "resume_data"
     
     # Primary Key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # time-ordered for insert locality
     
     # Foreign Key (one-to-one)
     resume_id = Column(
@@ -84,26 +121,53 @@ class ResumeData(Base):
     
     # Extracted Data
     raw_text = Column(Text, nullable=True)
-    skills = Column(JSONB, default=list, nullable=False)  # ["Python", "FastAPI", ...]
-    experience = Column(JSONB, default=list, nullable=False)  # [{title, company, ...}, ...]
-    education = Column(JSONB, default=list, nullable=False)  # [{degree, institution, ...}, ...]
-    certifications = Column(JSONB, default=list, nullable=False)
-    languages = Column(JSONB, default=list, nullable=False)
+    skills = Column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)  # ["Python", "FastAPI", ...]
+    skills_normalized = Column(JSONB, nullable=True)  # ["fastapi", "python", ...] for scoring (see normalize_skills)
+    experience = Column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)  # [{title, company, ...}, ...]
+    education = Column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)  # [{degree, institution, ...}, ...]
+    certifications = Column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)
+    languages = Column(JSONB, server_default=text("'[]'::jsonb"), nullable=False)
     
     # Computed Fields
     total_experience_years = Column(Float, nullable=True, index=True)
     summary = Column(Text, nullable=True)  # AI-generated summary
     
     # Metadata
-    resume_metadata = Column(JSONB, default=dict, nullable=False)
+    resume_metadata = Column(JSONB, server_default=text("'{}'::jsonb"), nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     resume = relationship("Resume", back_populates="resume_data")
     
+    # Indexes: GIN (jsonb_path_ops) for @> containment filters on the JSONB lists
+    __table_args__ = tuple(
+        Index(
+            f"ix_resume_data_{column}_gin",
+            column,
+            postgresql_using="gin",
+            postgresql_ops={column: "jsonb_path_ops"},
+        )
+        for column in ("skills", "experience", "education", "certifications", "languages")
+    )
+    
+    @classmethod
+    async def bulk_insert(cls, session, rows: List[Dict[str, Any]]) -> None:
+        """
+        Insert many rows in one executemany statement.
+        
+        Bypasses the ORM unit of work (no per-row objects or flush). Columns
+        left out of a row get their server defaults. The caller commits.
+        
+        Args:
+            session: AsyncSession to execute on
+            rows: Column values, one dict per row
+        """
+        if rows:
+            await session.execute(insert(cls), rows)
+    
     def __repr__(self):
         return f"<ResumeData(resume_id={self.resume_id}, skills_count={len(self.skills or [])})>"
 
@@ -114,7 +178,7 @@ class ResumeEmbedding(Base):
     __tablename__ = "resume_embeddings"
     
     # Primary Key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)  # time-ordered for insert locality
     
     # Foreign Key
     resume_id = Column(
@@ -132,10 +196,10 @@ class ResumeEmbedding(Base):
     chunk_index = Column(Integer, nullable=False)
     
     # Metadata
-    embedding_metadata = Column(JSONB, default=dict, nullable=False)
+    embedding_metadata = Column(JSONB, server_default=text("'{}'::jsonb"), nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     resume = relationship("Resume", back_populates="embeddings")
@@ -3,7 +3,7 @@ User model for authentication and authorization.
 """
 from uuid import uuid4
 
-from sqlalchemy import Boolean, Column, DateTime, String, func
+from sqlalchemy import Boolean, Column, DateTime, String, false, func, true
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -27,15 +27,22 @@ class User(Base):
     company_name = Column(String(255), nullable=True)
     
     # Status
-    is_active = Column(Boolean, default=True, nullable=False)
-    is_superuser = Column(Boolean, default=False, nullable=False)
+    is_active = Column(Boolean, server_default=true(), nullable=False)
+    is_superuser = Column(Boolean, server_default=false(), nullable=False)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
-    jobs = relationship("Job", back_populates="owner", cascade="all, delete-orphan")
+    # Never lazy-loaded (use selectinload); deletes rely on ON DELETE CASCADE
+    jobs = relationship(
+        "Job",
+        back_populates="owner",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise_on_sql"
+    )
     
     def __repr__(self):
         return f"<User(email={self.email}, name={self.full_name})>"
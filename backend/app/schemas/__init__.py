@@ -3,14 +3,16 @@ Pydantic schemas package.
 """
 from app.schemas.user import User, UserCreate, UserUpdate, UserInToken
 from app.schemas.auth import Token, TokenPayload, LoginRequest, SignupRequest
-from app.schemas.job import Job, JobCreate, JobUpdate, JobList
+from app.schemas.job import Job, JobCreate, JobUpdate, JobList, JobStatus
 from app.schemas.resume import (
     Resume, 
     ResumeCreate, 
     ResumeList, 
     ResumeWithData,
     ResumeDataSchema,
-    FileUploadResponse
+    FileUploadResponse,
+    ParsingStatus,
+    RESUME_LIST_ADAPTER
 )
 
 __all__ = [
@@ -26,10 +28,13 @@ __all__ = [
     "JobCreate",
     "JobUpdate",
     "JobList",
+    "JobStatus",
     "Resume",
     "ResumeCreate",
     "ResumeList",
     "ResumeWithData",
     "ResumeDataSchema",
     "FileUploadResponse",
+    "ParsingStatus",
+    "RESUME_LIST_ADAPTER",
 ]
\ No newline at end of file
@@ -1,25 +1,43 @@
 """
 Pydantic schemas for authentication.
 """
-from pydantic import BaseModel, EmailStr, Field
+from dataclasses import dataclass
 
+from pydantic import BaseModel, EmailStr, Field, field_validator
 
-class Token(BaseModel):
+
+# Token and TokenPayload carry data we produce or have already verified, so
+# they are plain slotted dataclasses instead of validating models.
+@dataclass(slots=True, frozen=True)
+class Token:
     """JWT token response."""
     access_token: str
     token_type: str = "bearer"
 
 
-class TokenPayload(BaseModel):
+@dataclass(slots=True, frozen=True)
+class TokenPayload:
     """JWT token payload."""
     sub: str  # Subject (user_id)
     exp: int  # Expiration time
 
 
 class LoginRequest(BaseModel):
-    """Login request schema."""
-    email: EmailStr
+    """
+    Login request schema.
+    
+    email is a plain string: login only looks the address up, so full
+    EmailStr validation (done once at signup) is not repeated here.
+    """
+    email: str = Field(..., min_length=3, max_length=255)
     password: str = Field(..., min_length=1)
+    
+    @field_validator("email")
+    @classmethod
+    def normalize_email(cls, value: str) -> str:
+        """Lowercase the domain, as EmailStr does for stored addresses."""
+        local, at, domain = value.strip().rpartition("@")
+        return f"{local}@{domain.lower()}" if at else value
 
 
 class SignupRequest(BaseModel):
@@ -2,12 +2,16 @@
 Pydantic schemas for Job model.
 """
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field, ConfigDict
 
 
+# Allowed job statuses (mirrors the check_job_status constraint)
+JobStatus = Literal["open", "closed", "draft"]
+
+
 # Base schema with common fields
 class JobBase(BaseModel):
     """Base job schema."""
@@ -23,7 +27,7 @@ class JobBase(BaseModel):
 # Schema for job creation
 class JobCreate(JobBase):
     """Schema for creating a new job."""
-    status: Optional[str] = Field("draft", max_length=50)  # open, closed, draft
+    status: JobStatus = "draft"
 
 
 # Schema for job update
@@ -36,7 +40,7 @@ class JobUpdate(BaseModel):
     employment_type: Optional[str] = Field(None, max_length=50)
     experience_level: Optional[str] = Field(None, max_length=50)
     salary_range: Optional[str] = Field(None, max_length=100)
-    status: Optional[str] = Field(None, max_length=50)
+    status: Optional[JobStatus] = None
 
 
 # Schema for job in response
@@ -48,7 +52,7 @@ class Job(JobBase):
     created_at: datetime
     updated_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 # Schema for job list (minimal data)
@@ -61,4 +65,4 @@ class JobList(BaseModel):
     status: str
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
@@ -2,10 +2,14 @@
 Pydantic schemas for Resume model.
 """
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Literal, Optional, List, Dict, Any
 from uuid import UUID
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
+
+
+# Allowed parsing statuses (mirrors the check_parsing_status constraint)
+ParsingStatus = Literal["pending", "processing", "completed", "failed"]
 
 
 # Base schema
@@ -40,7 +44,7 @@ class Resume(ResumeBase):
     created_at: datetime
     updated_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 # Schema for resume list (minimal data)
@@ -54,7 +58,11 @@ class ResumeList(BaseModel):
     rank: Optional[int]
     created_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
+
+
+# Serializes a whole resume list in one call (compiled once)
+RESUME_LIST_ADAPTER = TypeAdapter(List[ResumeList])
 
 
 # Schema for resume with parsed data
@@ -62,7 +70,7 @@ class ResumeWithData(Resume):
     """Schema for resume with parsed data included."""
     resume_data: Optional["ResumeDataSchema"] = None
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 # Schema for parsed resume data
@@ -82,7 +90,7 @@ class ResumeDataSchema(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="forbid")
 
 
 # Schema for file upload response
@@ -1,10 +1,14 @@
 """
 File storage service: local file system and S3.
 """
+import asyncio
+from functools import cached_property
+import hashlib
 import os
 import shutil
 from pathlib import Path
-from typing import BinaryIO, Optional
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, BinaryIO, Optional, Sequence, Tuple
 from uuid import uuid4
 
 import aiofiles
@@ -13,6 +17,19 @@ from fastapi import UploadFile, HTTPException, status
 from app.core.config import settings
 
 
+# Bytes read from an upload per chunk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Chunk size for the threaded local copy (no per-chunk event loop hop)
+LOCAL_COPY_CHUNK_SIZE = 1024 * 1024
+
+# Content types by file extension
+_CONTENT_TYPES = {
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.doc': 'application/msword',
+}
+
+
 class FileStorageService:
     """
     Handle file storage (local or S3).
@@ -30,68 +47,143 @@ class FileStorageService:
         if not self.use_s3:
             self.local_storage_path.mkdir(parents=True, exist_ok=True)
     
-    async def save_file(
-        self, 
-        file: UploadFile, 
-        job_id: str,
-        allowed_extensions: Optional[list] = None
-    ) -> dict:
+    @cached_property
+    def s3_client(self):
         """
-        Save uploaded file to storage.
+        Shared S3 client, created on first use.
+        
+        boto3 clients are thread-safe, so one client (and its connection
+        pool) is reused by every request; calls run in worker threads.
+        """
+        import boto3
+        from botocore.config import Config
+        
+        return boto3.client(
+            's3',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION,
+            config=Config(
+                max_pool_connections=50,
+                retries={'max_attempts': 3, 'mode': 'adaptive'}
+            )
+        )
+    
+    @cached_property
+    def s3_transfer_config(self):
+        """Managed transfer settings: 8 MB multipart parts, 4 uploaded in parallel."""
+        from boto3.s3.transfer import TransferConfig
+        
+        return TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=4
+        )
+    
+    def validate_upload(
+        self,
+        file: UploadFile,
+        allowed_extensions: Optional[Sequence[str]] = None
+    ) -> str:
+        """
+        Check an upload's extension and declared size without reading it.
         
         Args:
             file: Uploaded file
-            job_id: Job ID for organizing files
-            allowed_extensions: List of allowed file extensions
+            allowed_extensions: Allowed file extensions (default: from settings)
             
         Returns:
-            Dictionary with file_path, file_name, file_size, file_type
+            File extension (lowercase, without dot)
             
         Raises:
             HTTPException: If file validation fails
         """
-        # Validate file
         if allowed_extensions is None:
             allowed_extensions = settings.allowed_extensions_list
         
         # Check file extension
-        file_extension = Path(file.filename).suffix.lower().lstrip('.')
+        name, dot, extension = file.filename.rpartition('.')
+        file_extension = extension.lower() if dot and name else ''
         if file_extension not in allowed_extensions:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File type .{file_extension} not allowed. Allowed types: {', '.join(allowed_extensions)}"
             )
         
-        # Read file content
-        # Reset file pointer to beginning (important!)
+        # Check declared size before reading anything (the limit is enforced
+        # again while streaming, in case the size is unknown or wrong)
+        if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+            raise self._too_large()
+        
+        return file_extension
+    
+    async def hash_upload(
+        self,
+        file: UploadFile,
+        allowed_extensions: Optional[Sequence[str]] = None
+    ) -> str:
+        """
+        Validate an upload and compute the SHA-256 of its content.
+        
+        Reads the request's spooled copy only; nothing is written to storage,
+        so duplicates can be detected before save_file.
+        
+        Args:
+            file: Uploaded file
+            allowed_extensions: Allowed file extensions (default: from settings)
+            
+        Returns:
+            Hex-encoded SHA-256 digest
+            
+        Raises:
+            HTTPException: If file validation fails
+        """
+        self.validate_upload(file, allowed_extensions)
+        
+        await file.seek(0)
+        hasher = hashlib.sha256()
+        async for chunk in self._iter_upload(file):
+            hasher.update(chunk)
         await file.seek(0)
-        content = await file.read()
-        file_size = len(content)
         
-        # Check file size
-        if file_size > settings.MAX_UPLOAD_SIZE:
-            max_mb = settings.MAX_UPLOAD_SIZE / (1024 * 1024)
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size: {max_mb}MB"
-            )
+        return hasher.hexdigest()
+    
+    async def save_file(
+        self, 
+        file: UploadFile, 
+        job_id: str,
+        allowed_extensions: Optional[Sequence[str]] = None
+    ) -> dict:
+        """
+        Save uploaded file to storage.
         
-        if file_size == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File is empty"
-            )
+        Args:
+            file: Uploaded file
+            job_id: Job ID for organizing files
+            allowed_extensions: Allowed file extensions (default: from settings)
+            
+        Returns:
+            Dictionary with file_path, file_name, file_size, file_type
+            
+        Raises:
+            HTTPException: If file validation fails
+        """
+        # Validate file
+        file_extension = self.validate_upload(file, allowed_extensions)
         
         # Generate unique filename
         unique_id = uuid4().hex[:8]
         safe_filename = f"{unique_id}_{Path(file.filename).name}"
         
+        # Reset file pointer to beginning (important!)
+        await file.seek(0)
+        
         if self.use_s3:
             # Save to S3
-            file_path = await self._save_to_s3(content, job_id, safe_filename)
+            file_path, file_size = await self._save_to_s3(file, job_id, safe_filename)
         else:
             # Save to local file system
-            file_path = await self._save_to_local(content, job_id, safe_filename)
+            file_path, file_size = await self._save_to_local(file, job_id, safe_filename)
         
         return {
             "file_path": file_path,
@@ -100,17 +192,57 @@ class FileStorageService:
             "file_type": file_extension
         }
     
-    async def _save_to_local(self, content: bytes, job_id: str, filename: str) -> str:
+    @staticmethod
+    def _too_large() -> HTTPException:
+        """Error for uploads over MAX_UPLOAD_SIZE."""
+        max_mb = settings.MAX_UPLOAD_SIZE / (1024 * 1024)
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File too large. Maximum size: {max_mb}MB"
+        )
+    
+    @staticmethod
+    async def _iter_upload(file: UploadFile) -> AsyncIterator[bytes]:
         """
-        Save file to local file system.
+        Yield an uploaded file in chunks, enforcing size limits.
         
         Args:
-            content: File content
+            file: Uploaded file
+            
+        Yields:
+            File content chunks
+            
+        Raises:
+            HTTPException: If the file exceeds MAX_UPLOAD_SIZE or is empty
+        """
+        size = 0
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > settings.MAX_UPLOAD_SIZE:
+                raise FileStorageService._too_large()
+            yield chunk
+        
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File is empty"
+            )
+    
+    async def _save_to_local(self, file: UploadFile, job_id: str, filename: str) -> Tuple[str, int]:
+        """
+        Copy an uploaded file to the local file system.
+        
+        The whole copy runs in one worker thread (one hop instead of one
+        per chunk through aiofiles). A partially written file is removed if
+        the upload is rejected.
+        
+        Args:
+            file: Uploaded file
             job_id: Job ID for organizing files
             filename: Filename
             
         Returns:
-            File path
+            (file path, file size in bytes)
         """
         # Create job-specific directory
         job_dir = self.local_storage_path / job_id
@@ -119,55 +251,93 @@ class FileStorageService:
         # Full file path
         file_path = job_dir / filename
         
-        # Write file in binary mode (important for PDFs!)
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
+        file_size = await asyncio.to_thread(self._copy_upload_sync, file.file, file_path)
         
         # Return relative path
-        return str(file_path)
+        return str(file_path), file_size
+    
+    @staticmethod
+    def _copy_upload_sync(source: BinaryIO, file_path: Path) -> int:
+        """
+        Copy an upload's spooled file to disk, enforcing size limits.
+        
+        Args:
+            source: Upload file object (positioned at the start)
+            file_path: Destination path
+            
+        Returns:
+            File size in bytes
+            
+        Raises:
+            HTTPException: If the file exceeds MAX_UPLOAD_SIZE or is empty
+        """
+        file_size = 0
+        try:
+            # Write file in binary mode (important for PDFs!)
+            with open(file_path, 'wb') as f:
+                while chunk := source.read(LOCAL_COPY_CHUNK_SIZE):
+                    file_size += len(chunk)
+                    if file_size > settings.MAX_UPLOAD_SIZE:
+                        raise FileStorageService._too_large()
+                    f.write(chunk)
+            
+            if file_size == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File is empty"
+                )
+        except BaseException:
+            file_path.unlink(missing_ok=True)
+            raise
+        
+        return file_size
     
-    async def _save_to_s3(self, content: bytes, job_id: str, filename: str) -> str:
+    async def _save_to_s3(self, file: UploadFile, job_id: str, filename: str) -> Tuple[str, int]:
         """
-        Save file to AWS S3.
+        Stream an uploaded file to AWS S3.
+        
+        The upload is spooled (in memory up to 1 MB, then on disk) while the
+        size limit is checked, and handed to boto3's managed transfer, which
+        uploads files over 8 MB as concurrent multipart parts.
         
         Args:
-            content: File content
+            file: Uploaded file
             job_id: Job ID for organizing files
             filename: Filename
             
         Returns:
-            S3 path (key)
+            (S3 path (key), file size in bytes)
         """
-        import boto3
         from botocore.exceptions import ClientError
         
-        # Initialize S3 client
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
-        
         # S3 key (path)
         s3_key = f"resumes/{job_id}/{filename}"
         
-        try:
-            # Upload file
-            s3_client.put_object(
-                Bucket=settings.AWS_BUCKET_NAME,
-                Key=s3_key,
-                Body=content,
-                ContentType=self._get_content_type(filename)
-            )
+        with SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+            file_size = 0
+            async for chunk in self._iter_upload(file):
+                spool.write(chunk)
+                file_size += len(chunk)
+            spool.seek(0)
             
-            return s3_key
+            try:
+                # Upload file
+                await asyncio.to_thread(
+                    self.s3_client.upload_fileobj,
+                    spool,
+                    settings.AWS_BUCKET_NAME,
+                    s3_key,
+                    ExtraArgs={"ContentType": self._get_content_type(filename)},
+                    Config=self.s3_transfer_config
+                )
+            
+            except ClientError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to upload file to S3: {str(e)}"
+                )
         
-        except ClientError as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload file to S3: {str(e)}"
-            )
+        return s3_key, file_size
     
     async def get_file(self, file_path: str) -> bytes:
         """
@@ -199,22 +369,89 @@ class FileStorageService:
     
     async def _get_from_s3(self, s3_key: str) -> bytes:
         """Get file from S3."""
-        import boto3
         from botocore.exceptions import ClientError
         
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
+        try:
+            response = await asyncio.to_thread(
+                self.s3_client.get_object,
+                Bucket=settings.AWS_BUCKET_NAME,
+                Key=s3_key
+            )
+            return await asyncio.to_thread(response['Body'].read)
+        
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchKey':
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="File not found"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to retrieve file from S3: {str(e)}"
+            )
+    
+    def get_local_path(self, file_path: str) -> Path:
+        """
+        Resolve a stored file on local storage.
+        
+        Args:
+            file_path: Path returned by save_file
+            
+        Returns:
+            Path to the file
+            
+        Raises:
+            HTTPException: If the file does not exist
+        """
+        path = Path(file_path)
+        
+        if not path.exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found"
+            )
+        
+        return path
+    
+    async def iter_file(self, file_path: str, chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        """
+        Open a stored file for streaming.
+        
+        The file is looked up before returning, so a missing file raises
+        here (404) rather than after a streaming response has started.
+        
+        Args:
+            file_path: Path to file (local or S3 key)
+            chunk_size: Bytes per chunk
+            
+        Returns:
+            Async iterator over the file content
+        """
+        if self.use_s3:
+            body = await self._open_s3_body(file_path)
+            return self._iter_s3_body(body, chunk_size)
+        else:
+            path = self.get_local_path(file_path)
+            return self._iter_local(path, chunk_size)
+    
+    @staticmethod
+    async def _iter_local(path: Path, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield chunks of a local file."""
+        async with aiofiles.open(path, 'rb') as f:
+            while chunk := await f.read(chunk_size):
+                yield chunk
+    
+    async def _open_s3_body(self, s3_key: str):
+        """Get the streaming body of an S3 object."""
+        from botocore.exceptions import ClientError
         
         try:
-            response = s3_client.get_object(
+            response = await asyncio.to_thread(
+                self.s3_client.get_object,
                 Bucket=settings.AWS_BUCKET_NAME,
                 Key=s3_key
             )
-            return response['Body'].read()
+            return response['Body']
         
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
@@ -227,6 +464,15 @@ class FileStorageService:
                 detail=f"Failed to retrieve file from S3: {str(e)}"
             )
     
+    @staticmethod
+    async def _iter_s3_body(body, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield chunks of an S3 streaming body (reads run in a thread)."""
+        try:
+            while chunk := await asyncio.to_thread(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+    
     async def delete_file(self, file_path: str) -> bool:
         """
         Delete file from storage.
@@ -253,18 +499,11 @@ class FileStorageService:
     
     async def _delete_from_s3(self, s3_key: str) -> bool:
         """Delete file from S3."""
-        import boto3
         from botocore.exceptions import ClientError
         
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
-        
         try:
-            s3_client.delete_object(
+            await asyncio.to_thread(
+                self.s3_client.delete_object,
                 Bucket=settings.AWS_BUCKET_NAME,
                 Key=s3_key
             )
@@ -275,13 +514,10 @@ class FileStorageService:
     @staticmethod
     def _get_content_type(filename: str) -> str:
         """Get content type based on file extension."""
-        extension = Path(filename).suffix.lower()
-        content_types = {
-            '.pdf': 'application/pdf',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.doc': 'application/msword',
-        }
-        return content_types.get(extension, 'application/octet-stream')
+        dot = filename.rfind('.')
+        if dot < 0:
+            return 'application/octet-stream'
+        return _CONTENT_TYPES.get(filename[dot:].lower(), 'application/octet-stream')
 
 
 # Global instance
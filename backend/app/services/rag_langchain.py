@@ -2,22 +2,72 @@
 LangChain-based RAG service: Modern LangChain 1.0+ implementation.
 Uses recommended patterns: Direct LLM + Retriever (no legacy chains).
 """
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
 from uuid import UUID
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
-from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_chroma import Chroma
 
 from app.core.config import settings
-from app.core import get_llm, get_embeddings
+from app.core import get_llm, get_embeddings, openai_semaphore
+from app.core.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
 
+# Retrieval profiles (settings.RAG_PROFILE): HNSW settings for the resume
+# collection and the default number of chunks per query. "balanced" is tuned
+# for recall at 10k-500k chunks. Chroma applies the HNSW settings when the
+# collection is created; an existing collection keeps its settings until it
+# is rebuilt.
+_RAG_PROFILES = {
+    "speed": {"M": 16, "construction_ef": 100, "search_ef": 50, "top_k": 3},
+    "balanced": {"M": 32, "construction_ef": 200, "search_ef": 100, "top_k": 5},
+    "recall": {"M": 48, "construction_ef": 400, "search_ef": 200, "top_k": 10},
+}
+
+# Prompts are static, so they are built once at import
+_RAG_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert AI recruiter assistant. Use the following resume excerpts to answer the recruiter's question.
+
+Resume excerpts:
+{context}
+
+Instructions:
+- Answer based ONLY on the provided resume excerpts
+- Be specific and cite candidate names when mentioned
+- If information isn't in the excerpts, clearly state that
+- Provide actionable insights for the recruiter
+- Keep your answer concise but informative"""),
+    ("human", "{question}")
+])
+
+_CONV_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You are an expert AI recruiter assistant having a conversation about candidates.
+
+Use the following resume excerpts and chat history to answer the question.
+
+Resume excerpts:
+{context}
+
+Previous conversation:
+{chat_history}
+
+Instructions:
+- Consider the conversation context
+- Answer based on the resume excerpts
+- Reference previous questions if relevant
+- Be conversational but professional"""),
+    ("human", "{question}")
+])
+
+
 class LangChainRAGService:
     """
     Modern RAG service using LangChain 1.0+ recommended patterns.
@@ -37,28 +87,95 @@ class LangChainRAGService:
         # Collection name
         self.collection_name = "resume_embeddings"
         
+        profile = _RAG_PROFILES[settings.RAG_PROFILE]
+        self.default_top_k = profile["top_k"]
+        
         # Initialize Chroma vector store
         self.vectorstore = Chroma(
             collection_name=self.collection_name,
             embedding_function=self.embeddings,
-            persist_directory=settings.VECTOR_STORE_PATH
+            persist_directory=settings.VECTOR_STORE_PATH,
+            collection_metadata={
+                "hnsw:space": "cosine",
+                "hnsw:M": profile["M"],
+                "hnsw:construction_ef": profile["construction_ef"],
+                "hnsw:search_ef": profile["search_ef"],
+            }
         )
         
+        # Short-lived cache for collection stats (count() is not free)
+        self._stats_cache = TTLCache(maxsize=4, ttl=10)
+        
+        # Answers to repeated queries; invalidated per job when resumes are added
+        self._response_cache = TTLCache(maxsize=512, ttl=600)
+        
+        # Query embeddings by query hash (repeat queries skip the embeddings API)
+        self._query_embedding_cache = TTLCache(maxsize=1024)
+        
+        # Chunk embeddings by chunk text hash, stored as float32 arrays
+        # (~6 KB each); re-indexed or re-uploaded text skips the embeddings API
+        self._chunk_embedding_cache = TTLCache(maxsize=4096)
+        
+        # Answer chains: prompt → llm → parse output. Documents are retrieved
+        # once per query by the caller and passed in as formatted context.
+        self._rag_chain = _RAG_PROMPT | self.llm | StrOutputParser()
+        self._conversational_chain = _CONV_PROMPT | self.llm | StrOutputParser()
+        
         logger.info("LangChain RAG service initialized (v1.0+ modern pattern)")
     
-    def _format_docs(self, docs: List[Document]) -> str:
-        """Format documents into a single context string."""
-        formatted = []
-        for i, doc in enumerate(docs, 1):
-            candidate = doc.metadata.get('candidate_name', 'Unknown')
-            formatted.append(f"[Resume {i} - {candidate}]\n{doc.page_content}\n")
-        return "\n".join(formatted)
+    def get_collection_count(self) -> int:
+        """
+        Get the number of chunks in the collection.
+        
+        Cached for a few seconds; invalidated whenever documents are added
+        or deleted through this service.
+        
+        Returns:
+            Total number of stored chunks
+        """
+        total = self._stats_cache.get("total")
+        if total is None:
+            total = self.vectorstore._collection.count()
+            self._stats_cache.set("total", total)
+        return total
+    
+    @staticmethod
+    def _response_cache_key(query: str, job_id: Optional[UUID], top_k: int) -> str:
+        """Build the response cache key for a (normalized) query."""
+        normalized = " ".join(query.lower().split())
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"rag:{job_id or 'all'}:{digest}:{top_k}"
+    
+    async def _retrieve(self, query: str, job_id: Optional[UUID], top_k: int) -> List[Document]:
+        """
+        Find the chunks most similar to a query, optionally within one job.
+        
+        Args:
+            query: Natural language query
+            job_id: Optional job ID filter
+            top_k: Number of chunks to retrieve
+            
+        Returns:
+            Matching documents, most similar first
+        """
+        key = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        embedding = self._query_embedding_cache.get(key)
+        if embedding is None:
+            async with openai_semaphore:
+                embedding = await self.embeddings.aembed_query(query)
+            self._query_embedding_cache.set(key, embedding)
+        
+        return await self.vectorstore.asimilarity_search_by_vector(
+            embedding,
+            k=top_k,
+            filter={"job_id": str(job_id)} if job_id else None
+        )
     
     async def query_with_retrieval_qa(
         self,
         query: str,
         job_id: Optional[UUID] = None,
-        top_k: int = 5
+        top_k: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Query resumes using modern LCEL pattern.
@@ -68,67 +185,43 @@ class LangChainRAGService:
         Args:
             query: Natural language query
             job_id: Optional job ID filter
-            top_k: Number of chunks to retrieve
+            top_k: Number of chunks to retrieve (default: from RAG_PROFILE)
             
         Returns:
             Dictionary with answer and source documents
         """
+        top_k = top_k or self.default_top_k
+        cache_key = self._response_cache_key(query, job_id, top_k)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Retrieval query served from cache")
+            return cached
+        
         try:
             logger.info(f"Processing retrieval query: {query[:100]}...")
             
-            # Create retriever with optional filter
-            search_kwargs = {"k": top_k}
-            if job_id:
-                search_kwargs["filter"] = {"job_id": str(job_id)}
-            
-            retriever = self.vectorstore.as_retriever(
-                search_type="similarity",
-                search_kwargs=search_kwargs
-            )
-            
-            # Create prompt template
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are an expert AI recruiter assistant. Use the following resume excerpts to answer the recruiter's question.
-
-Resume excerpts:
-{context}
-
-Instructions:
-- Answer based ONLY on the provided resume excerpts
-- Be specific and cite candidate names when mentioned
-- If information isn't in the excerpts, clearly state that
-- Provide actionable insights for the recruiter
-- Keep your answer concise but informative"""),
-                ("human", "{question}")
-            ])
-            
-            # Build LCEL chain (modern pattern)
-            # retriever → format docs → prompt → llm → parse output
-            rag_chain = (
-                {
-                    "context": retriever | self._format_docs,
-                    "question": RunnablePassthrough()
-                }
-                | prompt
-                | self.llm
-                | StrOutputParser()
-            )
+            # Retrieve once: the same documents feed the prompt and the sources
+            source_docs = await self._retrieve(query, job_id, top_k)
+            context, sources = self._format_docs_and_sources(source_docs)
             
             # Invoke chain
-            answer = rag_chain.invoke(query)
-            
-            # Get source documents separately
-            source_docs = retriever.invoke(query)
+            async with openai_semaphore:
+                answer = await self._rag_chain.ainvoke({
+                    "context": context,
+                    "question": query
+                })
             
             # Format response
             response = {
                 "answer": answer,
-                "sources": self._format_sources(source_docs),
+                "sources": sources,
                 "query": query,
                 "num_sources": len(source_docs),
                 "chain_type": "LCEL RAG (Modern)"
             }
             
+            self._response_cache.set(cache_key, response)
+            
             logger.info("Retrieval query completed successfully")
             return response
             
@@ -147,7 +240,7 @@ Instructions:
         query: str,
         chat_history: Optional[List[tuple]] = None,
         job_id: Optional[UUID] = None,
-        top_k: int = 5
+        top_k: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Query with conversation history using modern LCEL.
@@ -156,72 +249,37 @@ Instructions:
             query: Natural language query
             chat_history: List of (question, answer) tuples
             job_id: Optional job ID filter
-            top_k: Number of chunks to retrieve
+            top_k: Number of chunks to retrieve (default: from RAG_PROFILE)
             
         Returns:
             Dictionary with answer and source documents
         """
+        top_k = top_k or self.default_top_k
         try:
             logger.info(f"Processing conversational query: {query[:100]}...")
             
-            # Create retriever
-            search_kwargs = {"k": top_k}
-            if job_id:
-                search_kwargs["filter"] = {"job_id": str(job_id)}
-            
-            retriever = self.vectorstore.as_retriever(
-                search_type="similarity",
-                search_kwargs=search_kwargs
-            )
+            # Retrieve once: the same documents feed the prompt and the sources
+            source_docs = await self._retrieve(query, job_id, top_k)
+            context, sources = self._format_docs_and_sources(source_docs)
             
             # Format chat history
-            history_text = ""
-            if chat_history:
-                for human_msg, ai_msg in chat_history:
-                    history_text += f"Human: {human_msg}\nAssistant: {ai_msg}\n\n"
-            
-            # Create conversational prompt
-            prompt = ChatPromptTemplate.from_messages([
-                ("system", """You are an expert AI recruiter assistant having a conversation about candidates.
-
-Use the following resume excerpts and chat history to answer the question.
-
-Resume excerpts:
-{context}
-
-Previous conversation:
-{chat_history}
-
-Instructions:
-- Consider the conversation context
-- Answer based on the resume excerpts
-- Reference previous questions if relevant
-- Be conversational but professional"""),
-                ("human", "{question}")
-            ])
-            
-            # Build LCEL chain with history
-            rag_chain = (
-                {
-                    "context": retriever | self._format_docs,
-                    "question": RunnablePassthrough(),
-                    "chat_history": lambda x: history_text
-                }
-                | prompt
-                | self.llm
-                | StrOutputParser()
-            )
+            history_text = "".join(
+                f"Human: {human_msg}\nAssistant: {ai_msg}\n\n"
+                for human_msg, ai_msg in chat_history
+            ) if chat_history else ""
             
             # Invoke chain
-            answer = rag_chain.invoke(query)
-            
-            # Get source documents
-            source_docs = retriever.invoke(query)
+            async with openai_semaphore:
+                answer = await self._conversational_chain.ainvoke({
+                    "context": context,
+                    "question": query,
+                    "chat_history": history_text
+                })
             
             # Format response
             response = {
                 "answer": answer,
-                "sources": self._format_sources(source_docs),
+                "sources": sources,
                 "query": query,
                 "num_sources": len(source_docs),
                 "chain_type": "Conversational LCEL (Modern)",
@@ -241,35 +299,41 @@ Instructions:
                 "chain_type": "Conversational LCEL (Modern)"
             }
     
-    def _format_sources(self, documents: List[Document]) -> List[Dict[str, Any]]:
+    def _format_docs_and_sources(
+        self,
+        documents: List[Document]
+    ) -> Tuple[str, List[Dict[str, Any]]]:
         """
-        Format source documents for response.
+        Build the prompt context and the response sources in one pass.
         
         Args:
             documents: List of LangChain Document objects
             
         Returns:
-            List of formatted source dictionaries
+            Tuple of (context string, list of formatted source dictionaries)
         """
-        # Deduplicate by resume_id
-        seen_resumes = set()
-        sources = []
+        formatted = []
+        # Deduplicate sources by resume_id (first chunk per resume wins; dict keeps order)
+        sources = {}
         
-        for doc in documents:
-            resume_id = doc.metadata.get("resume_id")
-            
-            if resume_id and resume_id not in seen_resumes:
-                seen_resumes.add(resume_id)
-                
-                sources.append({
+        for i, doc in enumerate(documents, 1):
+            metadata = doc.metadata
+            content = doc.page_content
+            candidate = metadata.get("candidate_name", "Unknown")
+            formatted.append(f"[Resume {i} - {candidate}]\n{content}\n")
+            
+            resume_id = metadata.get("resume_id")
+            if resume_id and resume_id not in sources:
+                sources[resume_id] = {
                     "resume_id": resume_id,
-                    "candidate_name": doc.metadata.get("candidate_name", "Unknown"),
-                    "excerpt": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
-                    "chunk_index": doc.metadata.get("chunk_index", 0),
-                    "metadata": doc.metadata
-                })
+                    "candidate_name": candidate,
+                    # Cut at a word boundary rather than mid-word
+                    "excerpt": content if len(content) <= 200 else content[:200].rsplit(" ", 1)[0] + "...",
+                    "chunk_index": metadata.get("chunk_index", 0),
+                    "metadata": metadata
+                }
         
-        return sources
+        return "\n".join(formatted), list(sources.values())
     
     async def add_documents_to_vectorstore(
         self,
@@ -283,41 +347,97 @@ Instructions:
         Args:
             resume_id: Resume UUID
             text_chunks: List of text chunks
-            metadata_list: List of metadata dicts
+            metadata_list: List of metadata dicts (a provided chunk_index
+                is kept, so callers can add a resume in several batches)
             
         Returns:
             True if successful
         """
         try:
-            # Create Document objects
-            documents = []
-            for i, (text, metadata) in enumerate(zip(text_chunks, metadata_list)):
-                doc = Document(
-                    page_content=text,
-                    metadata={
-                        **metadata,
-                        "resume_id": str(resume_id),
-                        "chunk_index": i
-                    }
-                )
-                documents.append(doc)
-            
-            # Add to vectorstore
-            self.vectorstore.add_documents(documents)
+            texts = list(text_chunks)
+            metadatas = [
+                {"chunk_index": i, **metadata, "resume_id": str(resume_id)}
+                for i, metadata in enumerate(metadata_list)
+            ]
+            # Stable IDs ("{resume_id}:{chunk_index}") allow deleting by ID
+            ids = [f"{resume_id}:{m['chunk_index']}" for m in metadatas]
+            
+            embeddings = await self._embed_chunks(texts)
+            
+            # Upsert: re-parsing a resume overwrites its chunks instead of
+            # colliding on the IDs
+            await asyncio.to_thread(
+                self.vectorstore._collection.upsert,
+                ids=ids,
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas
+            )
+            self._stats_cache.clear()
+            self._invalidate_responses({m.get("job_id") for m in metadata_list})
             
-            logger.info(f"Added {len(documents)} documents for resume {resume_id}")
+            logger.info(f"Added {len(texts)} documents for resume {resume_id}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to add documents: {str(e)}")
             return False
     
-    async def delete_documents(self, resume_id: UUID) -> bool:
+    async def _embed_chunks(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed chunk texts, reusing cached embeddings for identical texts.
+        
+        Only texts missing from the cache go to the embeddings API, in one
+        embed_documents call.
+        
+        Args:
+            texts: Chunk texts
+            
+        Returns:
+            Embedding per text, in input order
+        """
+        keys = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text in texts]
+        cached = [self._chunk_embedding_cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        
+        if missing:
+            async with openai_semaphore:
+                new_embeddings = await self.embeddings.aembed_documents(
+                    [texts[i] for i in missing]
+                )
+            for i, embedding in zip(missing, new_embeddings):
+                cached[i] = array("f", embedding)
+                self._chunk_embedding_cache.set(keys[i], cached[i])
+        
+        if len(missing) < len(texts):
+            logger.info(f"Reused {len(texts) - len(missing)} cached chunk embeddings")
+        
+        return [vector.tolist() for vector in cached]
+    
+    def _invalidate_responses(self, job_ids: set) -> None:
+        """
+        Drop cached answers that may be affected by new documents.
+        
+        Args:
+            job_ids: Job IDs (as strings) whose resumes changed
+        """
+        self._response_cache.delete_prefix("rag:all:")
+        for job_id in job_ids:
+            if job_id:
+                self._response_cache.delete_prefix(f"rag:{job_id}:")
+            else:
+                # Unknown job: can't target, so drop everything
+                self._response_cache.clear()
+                return
+    
+    async def delete_documents(self, resume_id: UUID, num_chunks: Optional[int] = None) -> bool:
         """
         Delete documents for a resume.
         
         Args:
             resume_id: Resume UUID
+            num_chunks: Number of chunks stored for the resume; when known,
+                the chunk IDs are derived instead of scanning metadata
             
         Returns:
             True if successful
@@ -326,13 +446,20 @@ Instructions:
             # Access underlying ChromaDB collection
             collection = self.vectorstore._collection
             
-            # Get all IDs for this resume
-            results = collection.get(
-                where={"resume_id": str(resume_id)}
-            )
+            if num_chunks is not None:
+                ids = [f"{resume_id}:{i}" for i in range(num_chunks)]
+            else:
+                # Chunks added before IDs were deterministic: look them up
+                results = collection.get(
+                    where={"resume_id": str(resume_id)},
+                    include=[]
+                )
+                ids = results.get('ids') if results else None
             
-            if results and results.get('ids'):
-                collection.delete(ids=results['ids'])
+            if ids:
+                collection.delete(ids=ids)
+                self._stats_cache.clear()
+                self._response_cache.clear()
                 logger.info(f"Deleted documents for resume {resume_id}")
             
             return True
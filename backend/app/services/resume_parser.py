@@ -1,16 +1,68 @@
 """
 Resume parser service: Extract structured data from resume text using LLM.
 """
+import hashlib
 import json
 import logging
-from typing import Dict, Any
+import os
+import time
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
 
+import aiofiles
+from pydantic import BaseModel, Field
+
 from app.core.config import settings
-from app.core import get_openai_client
+from app.core import get_openai_client, openai_semaphore
+from app.core.cache import TTLCache
+from app.core.tokenizer import truncate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Token budget for resume text in the extraction prompt
+RESUME_PROMPT_MAX_TOKENS = 3000
+
+# The response schema carries the field spec, so the prompt stays short
+_EXTRACTION_SYSTEM_PROMPT = (
+    "You are an expert HR assistant. Extract structured data from the resume. "
+    "Use null or an empty list for anything the resume does not mention."
+)
+
+
+# Structured output schemas (enforced server-side by the OpenAI API).
+# Structured outputs require every field, so optional values are nullable.
+class ParsedExperience(BaseModel):
+    """A work experience entry extracted from a resume."""
+    title: Optional[str] = Field(description="Job title")
+    company: Optional[str] = Field(description="Company name")
+    location: Optional[str] = Field(description="City, state/country")
+    start_date: Optional[str] = Field(description="YYYY-MM if possible, else text")
+    end_date: Optional[str] = Field(description='YYYY-MM, or "Present" if current')
+    duration_months: Optional[int] = Field(description="Estimated duration in months")
+    description: Optional[str] = Field(description="Brief description of responsibilities")
+
+
+class ParsedEducation(BaseModel):
+    """An education entry extracted from a resume."""
+    degree: Optional[str] = Field(description='Degree type, e.g. "Bachelor of Science"')
+    field: Optional[str] = Field(description='Field of study, e.g. "Computer Science"')
+    institution: Optional[str] = Field(description="School/University name")
+    graduation_year: Optional[int] = Field(description="Year of graduation")
+    gpa: Optional[float] = Field(description="GPA if mentioned")
+
+
+class ParsedResume(BaseModel):
+    """Structured data extracted from a resume."""
+    candidate_name: Optional[str] = Field(description="Full name of the candidate")
+    candidate_email: Optional[str] = Field(description="Email address")
+    phone: Optional[str] = Field(description="Phone number")
+    skills: List[str] = Field(description="Technical skills, tools, and technologies")
+    experience: List[ParsedExperience]
+    education: List[ParsedEducation]
+    certifications: List[str]
+    languages: List[str] = Field(description="Languages spoken")
+    summary: Optional[str] = Field(description="A 2-3 sentence professional summary")
+
 
 class ResumeParserService:
     """Parse resumes using LLM to extract structured data."""
@@ -19,6 +71,10 @@ class ResumeParserService:
         """Initialize OpenAI client."""
         self.client = get_openai_client()  # Use singleton instance
         self.model = settings.OPENAI_MODEL
+        self.parse_cache_path = settings.PARSE_CACHE_PATH
+        self.parse_cache_ttl = settings.PARSE_CACHE_TTL_DAYS * 86400
+        # Generated summaries keyed by a hash of their inputs
+        self._summary_cache = TTLCache(maxsize=1024)
     
     async def parse_resume(self, resume_text: str) -> Dict[str, Any]:
         """
@@ -30,35 +86,44 @@ class ResumeParserService:
         Returns:
             Dictionary with structured resume data
         """
+        # Identical text parsed by the same model gives the same result
+        cache_key = hashlib.sha256(
+            f"{self.model}\0{resume_text.strip()}".encode("utf-8")
+        ).hexdigest()
+        cached = await self._read_parse_cache(cache_key)
+        if cached is not None:
+            logger.info("Resume parsing served from cache")
+            # Stamped per parse, like a fresh result
+            cached["metadata"] = self._parse_metadata()
+            return cached
+        
         try:
             logger.info("Starting resume parsing with LLM")
             
-            # Create prompt for structured extraction
-            prompt = self._create_extraction_prompt(resume_text)
-            
-            # Call OpenAI API
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert HR assistant that extracts structured information from resumes. Always respond with valid JSON only, no additional text."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.1,  # Low temperature for consistent extraction
-                response_format={"type": "json_object"}
-            )
+            # Call OpenAI API with a structured output schema
+            async with openai_semaphore:
+                response = await self.client.chat.completions.parse(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": _EXTRACTION_SYSTEM_PROMPT},
+                        {
+                            "role": "user",
+                            "content": truncate_tokens(resume_text, RESUME_PROMPT_MAX_TOKENS, self.model)
+                        }
+                    ],
+                    temperature=0.1,  # Low temperature for consistent extraction
+                    response_format=ParsedResume
+                )
             
             # Parse response
-            result = response.choices[0].message.content
-            parsed_data = json.loads(result)
+            message = response.choices[0].message
+            if message.parsed is None:
+                raise ValueError(message.refusal or "No structured output returned")
             
             # Post-process and validate
-            structured_data = self._post_process_data(parsed_data)
+            structured_data = self._post_process_data(message.parsed.model_dump())
+            await self._write_parse_cache(cache_key, structured_data)
+            structured_data["metadata"] = self._parse_metadata()
             
             logger.info("Resume parsing completed successfully")
             return structured_data
@@ -67,68 +132,86 @@ class ResumeParserService:
             logger.error(f"Resume parsing failed: {str(e)}")
             raise Exception(f"Failed to parse resume: {str(e)}")
     
-    def _create_extraction_prompt(self, resume_text: str) -> str:
-        """Create prompt for LLM extraction."""
-        return f"""Extract the following information from this resume and return it as a JSON object:
-
-RESUME TEXT:
-{resume_text[:4000]}  # Limit to avoid token limits
-
-Extract:
-1. candidate_name: Full name of the candidate
-2. candidate_email: Email address
-3. phone: Phone number (if available)
-4. skills: List of technical skills, tools, and technologies
-5. experience: List of work experiences, each with:
-   - title: Job title
-   - company: Company name
-   - location: Location (city, state/country)
-   - start_date: Start date (YYYY-MM format if possible, or text)
-   - end_date: End date (YYYY-MM format, or "Present" if current)
-   - duration_months: Estimated duration in months
-   - description: Brief description of responsibilities
-6. education: List of education entries, each with:
-   - degree: Degree type (e.g., "Bachelor of Science")
-   - field: Field of study (e.g., "Computer Science")
-   - institution: School/University name
-   - graduation_year: Year of graduation
-   - gpa: GPA if mentioned
-7. certifications: List of certifications (simple string list)
-8. languages: List of languages spoken
-9. summary: A 2-3 sentence professional summary
-
-Return ONLY valid JSON with this exact structure:
-{{
-  "candidate_name": "string",
-  "candidate_email": "string",
-  "phone": "string or null",
-  "skills": ["skill1", "skill2"],
-  "experience": [
-    {{
-      "title": "string",
-      "company": "string",
-      "location": "string",
-      "start_date": "string",
-      "end_date": "string",
-      "duration_months": number,
-      "description": "string"
-    }}
-  ],
-  "education": [
-    {{
-      "degree": "string",
-      "field": "string",
-      "institution": "string",
-      "graduation_year": number,
-      "gpa": number or null
-    }}
-  ],
-  "certifications": ["cert1", "cert2"],
-  "languages": ["lang1", "lang2"],
-  "summary": "string"
-}}
-
-If any field cannot be found, use null or empty array as appropriate."""
+    def _parse_cache_file(self, cache_key: str) -> str:
+        """Path of the cache entry for a key (two-character fan-out directory)."""
+        return os.path.join(self.parse_cache_path, cache_key[:2], f"{cache_key}.json")
+    
+    async def _read_parse_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a cached parse result.
+        
+        Args:
+            cache_key: Hash of model and resume text
+            
+        Returns:
+            Cached structured data, or None on a miss, expired or unreadable entry
+        """
+        if not self.parse_cache_path:
+            return None
+        
+        path = self._parse_cache_file(cache_key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.parse_cache_ttl:
+                os.remove(path)
+                return None
+            async with aiofiles.open(path, 'r', encoding='utf-8') as f:
+                return json.loads(await f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to read parse cache entry {cache_key}: {str(e)}")
+            return None
+    
+    async def _write_parse_cache(self, cache_key: str, data: Dict[str, Any]) -> None:
+        """
+        Store a parse result; failures are logged and otherwise ignored.
+        
+        Args:
+            cache_key: Hash of model and resume text
+            data: Structured resume data
+        """
+        if not self.parse_cache_path:
+            return
+        
+        path = self._parse_cache_file(cache_key)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            async with aiofiles.open(tmp_path, 'w', encoding='utf-8') as f:
+                await f.write(json.dumps(data))
+            # Atomic rename: readers never see a partially written entry
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write parse cache entry {cache_key}: {str(e)}")
+    
+    def prune_parse_cache(self) -> int:
+        """
+        Delete parse cache entries older than PARSE_CACHE_TTL_DAYS (blocking).
+        
+        Entries hold candidate PII, so expired ones are removed from disk
+        rather than only skipped on read.
+        
+        Returns:
+            Number of files removed
+        """
+        if not self.parse_cache_path or not os.path.isdir(self.parse_cache_path):
+            return 0
+        
+        cutoff = time.time() - self.parse_cache_ttl
+        removed = 0
+        for root, _, files in os.walk(self.parse_cache_path):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError as e:
+                    logger.warning(f"Failed to prune parse cache file {path}: {str(e)}")
+        
+        if removed:
+            logger.info(f"Pruned {removed} expired parse cache entries")
+        return removed
     
     def _post_process_data(self, parsed_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -149,7 +232,8 @@ If any field cannot be found, use null or empty array as appropriate."""
         
         total_years = round(total_months / 12, 1) if total_months > 0 else 0
         
-        # Ensure all required fields exist
+        # Ensure all required fields exist (metadata is left out of the parse
+        # cache and stamped by parse_resume)
         result = {
             "candidate_name": parsed_data.get("candidate_name"),
             "candidate_email": parsed_data.get("candidate_email"),
@@ -160,15 +244,18 @@ If any field cannot be found, use null or empty array as appropriate."""
             "certifications": parsed_data.get("certifications", []),
             "languages": parsed_data.get("languages", []),
             "summary": parsed_data.get("summary"),
-            "total_experience_years": total_years,
-            "metadata": {
-                "parsed_at": datetime.now(timezone.utc).isoformat(),
-                "parser_model": self.model
-            }
+            "total_experience_years": total_years
         }
         
         return result
     
+    def _parse_metadata(self) -> Dict[str, Any]:
+        """Metadata stamped on every parse result, cached or not."""
+        return {
+            "parsed_at": datetime.now(timezone.utc).isoformat(),
+            "parser_model": self.model
+        }
+    
     async def generate_summary(self, resume_data: Dict[str, Any]) -> str:
         """
         Generate a professional summary from resume data.
@@ -184,31 +271,60 @@ If any field cannot be found, use null or empty array as appropriate."""
             if resume_data.get("summary"):
                 return resume_data["summary"]
             
+            skills = (resume_data.get('skills') or [])[:10]
+            years = resume_data.get('total_experience_years') or 0
+            experience = resume_data.get('experience') or [{}]
+            latest_role = experience[0].get('title') or 'N/A'
+            
+            # Too little data for the LLM to add anything
+            if len(skills) < 2 and not years:
+                return self._sparse_summary(skills, latest_role)
+            
+            # Same inputs always give an equivalent summary
+            cache_key = hashlib.sha256(
+                json.dumps([skills, years, latest_role], sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            cached = self._summary_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             # Create prompt for summary generation
             prompt = f"""Based on this resume data, write a concise 2-3 sentence professional summary:
 
-Skills: {', '.join(resume_data.get('skills', [])[:10])}
-Experience: {resume_data.get('total_experience_years', 0)} years
-Latest role: {resume_data.get('experience', [{}])[0].get('title', 'N/A') if resume_data.get('experience') else 'N/A'}
+Skills: {', '.join(skills)}
+Experience: {years} years
+Latest role: {latest_role}
 
 Write a professional summary highlighting key qualifications."""
             
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a professional resume writer."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=150
-            )
+            async with openai_semaphore:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": "You are a professional resume writer."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=150
+                )
             
-            return response.choices[0].message.content.strip()
+            summary = response.choices[0].message.content.strip()
+            self._summary_cache.set(cache_key, summary)
+            return summary
             
         except Exception as e:
             logger.warning(f"Summary generation failed: {str(e)}")
             return "Professional with diverse experience and skills."
 
+    
+    @staticmethod
+    def _sparse_summary(skills: List[str], latest_role: str) -> str:
+        """Templated summary for resumes with almost no structured data."""
+        summary = latest_role if latest_role != 'N/A' else "Professional"
+        if skills:
+            summary += f" with skills in {', '.join(skills)}"
+        return summary + "."
+
 
 # Global instance
 resume_parser = ResumeParserService()
@@ -1,14 +1,98 @@
 """
 Resume scoring service: Calculate match scores between resumes and jobs.
 """
+import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Any
+import re
+from typing import Dict, FrozenSet, List, Any, Optional, Set, Tuple
+
+import numpy as np
+from openai import NOT_GIVEN
 
 from app.core.config import settings
-from app.core import get_openai_client
+from app.core import get_openai_client, openai_semaphore
+from app.core.cache import TTLCache
+from app.core.tokenizer import count_tokens, truncate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Max inputs per embeddings request (OpenAI API limit)
+EMBEDDING_BATCH_SIZE = 2048
+
+# Max tokens across all inputs of one embeddings request (kept under the
+# API's per-request token limit, which a full batch of long texts exceeds)
+EMBEDDING_MAX_BATCH_TOKENS = 250_000
+
+# Seconds texts wait for concurrent callers' texts before an embeddings
+# request is sent (bounded latency for fewer, larger requests)
+EMBEDDING_BATCH_WINDOW = 0.010
+
+# Token budget for each embedded job text / resume summary (cut on token
+# boundaries; embedding cost and latency scale with tokens)
+EMBEDDING_MAX_TOKENS = 256
+
+# Component weights of the overall score
+SCORE_WEIGHTS = {
+    'skills': 0.50,      # 50% - Most important
+    'experience': 0.25,  # 25% - Important
+    'semantic': 0.25     # 25% - Context understanding
+}
+
+# Experience level thresholds: (min years, max years)
+_LEVEL_RANGES = {
+    'entry': (0, 2),
+    'junior': (0, 3),
+    'mid': (2, 6),
+    'middle': (2, 6),
+    'senior': (5, 15),
+    'lead': (7, 20),
+    'principal': (10, 25),
+    'staff': (8, 20)
+}
+
+# Level name -> index into the range arrays (unknown levels use -1, which
+# indexes the unused trailing entry)
+EXPERIENCE_LEVELS = {level: i for i, level in enumerate(_LEVEL_RANGES)}
+_LEVEL_MIN_YEARS = np.array([low for low, _ in _LEVEL_RANGES.values()] + [0], dtype=np.float64)
+_LEVEL_MAX_YEARS = np.array([high for _, high in _LEVEL_RANGES.values()] + [0], dtype=np.float64)
+
+# Common tech skills (lowercase)
+COMMON_SKILLS = (
+    'python', 'java', 'javascript', 'typescript', 'go', 'rust', 'c++', 'c#',
+    'react', 'vue', 'angular', 'node', 'fastapi', 'django', 'flask',
+    'postgresql', 'mysql', 'mongodb', 'redis', 'elasticsearch',
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform',
+    'git', 'ci/cd', 'jenkins', 'gitlab', 'github',
+    'machine learning', 'deep learning', 'ai', 'nlp',
+    'rest api', 'graphql', 'microservices', 'agile', 'scrum'
+)
+
+# All skills in one alternation, so text is scanned once instead of once per
+# skill. Lookarounds (not \b, which fails next to "+" or "#") keep "java"
+# from matching inside "javascript" and "go" inside "good".
+_SKILL_PATTERN = re.compile(
+    r"(?<!\w)(?:"
+    + "|".join(re.escape(skill) for skill in sorted(COMMON_SKILLS, key=len, reverse=True))
+    + r")(?!\w)"
+)
+
+
+def normalize_skills(skills: List[str]) -> List[str]:
+    """
+    Canonical form of a resume's skills for matching.
+    
+    Lowercased, stripped, deduplicated and sorted, with empty entries
+    dropped. Stored on resume_data at parse time so scoring reads it as is.
+    
+    Args:
+        skills: Skills as extracted from the resume
+        
+    Returns:
+        Normalized skills
+    """
+    return sorted({skill.lower().strip() for skill in skills} - {""})
+
 
 class ScoringService:
     """Score resumes based on job requirements."""
@@ -17,6 +101,19 @@ class ScoringService:
         """Initialize OpenAI client for embeddings."""
         self.client = get_openai_client()  # Use singleton instance
         self.embedding_model = settings.EMBEDDING_MODEL
+        self.embedding_dimensions = settings.EMBEDDING_DIMENSIONS
+        
+        # Unit-length float16 embeddings by blake2b hash of model + text
+        # (~3 KB each at 1536 dimensions)
+        self._embedding_cache = TTLCache(maxsize=4096)
+        # In-flight embedding requests by the same key, shared by concurrent callers
+        self._embedding_requests: Dict[bytes, asyncio.Future] = {}
+        
+        # Micro-batcher: texts waiting to be sent, the pending flush timer
+        # and the running requests
+        self._embedding_queue: List[Tuple[str, asyncio.Future]] = []
+        self._embedding_flush: Optional[asyncio.TimerHandle] = None
+        self._embedding_tasks: Set[asyncio.Task] = set()
     
     async def score_resume(
         self, 
@@ -33,74 +130,215 @@ class ScoringService:
         Returns:
             Score from 0-100
         """
-        try:
-            logger.info("Calculating resume score")
-            
-            # Extract job requirements
-            job_skills = self._extract_skills_from_text(
-                f"{job_data.get('requirements', '')} {job_data.get('description', '')}"
-            )
-            job_experience_level = job_data.get('experience_level', '').lower()
+        scores = await self.score_resumes([resume_data], job_data)
+        return scores[0]
+    
+    async def score_resumes(
+        self,
+        resumes: List[Dict[str, Any]],
+        job_data: Dict[str, Any]
+    ) -> List[float]:
+        """
+        Calculate match scores for many resumes against one job.
+        
+        Args:
+            resumes: Parsed resume data per resume
+            job_data: Job requirements and description
             
-            # Extract resume data
-            resume_skills = resume_data.get('skills', [])
-            resume_experience_years = resume_data.get('total_experience_years', 0)
+        Returns:
+            Score from 0-100 per resume, in input order
+        """
+        scores = await self.score_resumes_for_jobs(resumes, [job_data])
+        return [row[0] for row in scores]
+    
+    async def score_resumes_for_jobs(
+        self,
+        resumes: List[Dict[str, Any]],
+        jobs: List[Dict[str, Any]]
+    ) -> List[List[float]]:
+        """
+        Calculate match scores for many resumes against many jobs.
+        
+        All job texts and resume summaries are embedded together in batched
+        embeddings requests, so each job is embedded once and the requests
+        scale with the number of texts, not pairs. Semantic similarity for
+        every pair comes from one matrix product (see score_matrix). Pairs
+        already decided by skills and experience (SCORING_REJECT_THRESHOLD,
+        SCORING_ACCEPT_THRESHOLD) are scored without embeddings.
+        
+        Args:
+            resumes: Parsed resume data per resume
+            jobs: Job requirements and description per job
             
-            # Calculate component scores
-            skills_score = await self._calculate_skills_score(
-                resume_skills, 
-                job_skills
-            )
+        Returns:
+            Score from 0-100 per resume (rows) and job (columns), in input order
             
-            experience_score = self._calculate_experience_score(
-                resume_experience_years,
-                job_experience_level
+        Raises:
+            Exception: If embeddings can't be generated; no fallback score is
+                returned, so callers leave the resumes unscored
+        """
+        if not resumes or not jobs:
+            return [[] for _ in resumes]
+        
+        logger.info(f"Calculating scores for {len(resumes)} resumes x {len(jobs)} jobs")
+        
+        # Extract job requirements (once for all resumes)
+        job_skills = [
+            self._extract_skills_from_text(
+                f"{job_data.get('requirements', '')} {job_data.get('description', '')}"
             )
-            
-            semantic_score = await self._calculate_semantic_score(
-                resume_data,
-                job_data
+            for job_data in jobs
+        ]
+        
+        # Resume skills as normalized at parse time (normalized here,
+        # once per resume, for rows parsed before that)
+        resume_skills = [
+            frozenset(
+                resume_data['skills_normalized']
+                if resume_data.get('skills_normalized') is not None
+                else normalize_skills(resume_data.get('skills') or [])
             )
-            
-            # Weighted average
-            weights = {
-                'skills': 0.50,      # 50% - Most important
-                'experience': 0.25,  # 25% - Important
-                'semantic': 0.25     # 25% - Context understanding
-            }
-            
-            overall_score = (
-                skills_score * weights['skills'] +
-                experience_score * weights['experience'] +
-                semantic_score * weights['semantic']
+            for resume_data in resumes
+        ]
+        
+        # Experience scores for every pair in one vectorized pass
+        experience_scores = self._experience_scores(
+            np.array(
+                [[resume_data.get('total_experience_years') or 0] for resume_data in resumes],
+                dtype=np.float64
+            ),
+            np.array([
+                EXPERIENCE_LEVELS.get((job_data.get('experience_level') or '').lower(), -1)
+                for job_data in jobs
+            ])
+        )
+        
+        # Resume skills each job skill matches by meaning (opt-in)
+        synonyms = None
+        if settings.SKILL_SYNONYM_SIMILARITY is not None:
+            synonyms = await self._skill_synonyms(resume_skills, job_skills)
+        
+        # Skills scores for every pair
+        skills_scores = np.array([
+            [
+                await self._calculate_skills_score(
+                    resume_skills[i], job_skills[k], synonyms
+                )
+                for k in range(len(jobs))
+            ]
+            for i in range(len(resumes))
+        ])
+        
+        # Skip the semantic score where skills and experience already
+        # decide the outcome: it adds at most 100 * its weight
+        base_scores = (
+            skills_scores * SCORE_WEIGHTS['skills'] +
+            experience_scores * SCORE_WEIGHTS['experience']
+        )
+        rejected = base_scores + 100 * SCORE_WEIGHTS['semantic'] < settings.SCORING_REJECT_THRESHOLD
+        accepted = base_scores > settings.SCORING_ACCEPT_THRESHOLD
+        undecided = ~(rejected | accepted)
+        
+        # Get embeddings for resumes and jobs with an undecided pair only:
+        # job texts first, then one summary per resume
+        rows = np.flatnonzero(undecided.any(axis=1))
+        cols = np.flatnonzero(undecided.any(axis=0))
+        similarities = np.zeros(undecided.shape)
+        if rows.size:
+            embeddings = await self._get_embeddings_batch(
+                [self._create_job_text(jobs[k]) for k in cols]
+                + [self._create_resume_summary(resumes[i]) for i in rows]
             )
-            
-            # Round to 1 decimal place
-            overall_score = round(overall_score, 1)
-            
-            logger.info(
-                f"Score calculated: {overall_score} "
-                f"(skills={skills_score:.1f}, exp={experience_score:.1f}, sem={semantic_score:.1f})"
+            similarities[np.ix_(rows, cols)] = self.score_matrix(
+                np.stack(embeddings[len(cols):]),
+                np.stack(embeddings[:len(cols)])
             )
+        
+        # Semantic score on a 0-100 scale: cosine similarity is -1 to 1,
+        # but usually 0 to 1 for text. Decided pairs get its minimum
+        # (rejected) or midpoint (accepted).
+        semantic_scores = np.where(
+            rejected,
+            0.0,
+            np.where(accepted, 50.0, np.clip(similarities * 100, 0.0, 100.0))
+        )
+        
+        skipped = int(undecided.size - np.count_nonzero(undecided))
+        if skipped:
+            logger.info(f"Skipped semantic scoring for {skipped} decided pairs")
+        
+        return [
+            [
+                self._score_one(
+                    float(skills_scores[i, k]),
+                    float(experience_scores[i, k]),
+                    float(semantic_scores[i, k])
+                )
+                for k in range(len(jobs))
+            ]
+            for i in range(len(resumes))
+        ]
+    
+    async def prefetch_job_embedding(self, job_data: Dict[str, Any]) -> None:
+        """
+        Embed a job's text ahead of scoring.
+        
+        Called when a job is created or its text changes, so the first
+        scoring run finds the job embedding cached instead of waiting on it.
+        
+        Args:
+            job_data: Job title, description and requirements
+        """
+        await self._get_embeddings_batch([self._create_job_text(job_data)])
+    
+    def _score_one(
+        self,
+        skills_score: float,
+        experience_score: float,
+        semantic_score: float
+    ) -> float:
+        """
+        Combine component scores for one resume/job pair.
+        
+        Args:
+            skills_score: Skill match score
+            experience_score: Experience match score
+            semantic_score: Semantic similarity score
             
-            return overall_score
-            
-        except Exception as e:
-            logger.error(f"Scoring failed: {str(e)}")
-            # Return a neutral score on error
-            return 50.0
+        Returns:
+            Score from 0-100
+        """
+        # Weighted average
+        overall_score = (
+            skills_score * SCORE_WEIGHTS['skills'] +
+            experience_score * SCORE_WEIGHTS['experience'] +
+            semantic_score * SCORE_WEIGHTS['semantic']
+        )
+        
+        # Round to 1 decimal place
+        overall_score = round(overall_score, 1)
+        
+        logger.info(
+            f"Score calculated: {overall_score} "
+            f"(skills={skills_score:.1f}, exp={experience_score:.1f}, sem={semantic_score:.1f})"
+        )
+        
+        return overall_score
     
     async def _calculate_skills_score(
         self, 
-        resume_skills: List[str],
-        job_skills: List[str]
+        resume_skills: FrozenSet[str],
+        job_skills: List[str],
+        synonyms: Optional[Dict[str, FrozenSet[str]]] = None
     ) -> float:
         """
         Calculate skill match score.
         
         Args:
-            resume_skills: Skills from resume
-            job_skills: Required skills from job
+            resume_skills: Normalized skills from resume (see normalize_skills)
+            job_skills: Required skills from job (lowercase)
+            synonyms: Resume skills matching each job skill by meaning
+                (see _skill_synonyms), counted like partial matches
             
         Returns:
             Score from 0-100
@@ -111,136 +349,86 @@ class ScoringService:
         if not resume_skills:
             return 0.0
         
-        # Normalize skills (lowercase, strip)
-        resume_skills_normalized = [s.lower().strip() for s in resume_skills]
-        job_skills_normalized = [s.lower().strip() for s in job_skills]
-        
-        # Exact matches
-        exact_matches = sum(
-            1 for job_skill in job_skills_normalized 
-            if job_skill in resume_skills_normalized
-        )
+        # One string to search for job skills contained in any resume skill
+        # (newline-separated, so a match never spans two skills)
+        resume_skills_text = "\n".join(resume_skills)
         
-        # Partial matches (contains)
+        exact_matches = 0
         partial_matches = 0
-        for job_skill in job_skills_normalized:
-            if job_skill not in resume_skills_normalized:
-                # Check if job skill is substring of any resume skill
-                for resume_skill in resume_skills_normalized:
-                    if job_skill in resume_skill or resume_skill in job_skill:
-                        partial_matches += 0.5
-                        break
+        for job_skill in job_skills:
+            # Exact matches (hashed lookup)
+            if job_skill in resume_skills:
+                exact_matches += 1
+            # Partial matches (contains, either way)
+            elif job_skill in resume_skills_text or any(
+                resume_skill in job_skill for resume_skill in resume_skills
+            ):
+                partial_matches += 0.5
+            # Synonyms ("k8s" for "kubernetes")
+            elif synonyms and not synonyms.get(job_skill, frozenset()).isdisjoint(resume_skills):
+                partial_matches += 0.5
         
         total_matches = exact_matches + partial_matches
-        match_percentage = (total_matches / len(job_skills_normalized)) * 100
+        match_percentage = (total_matches / len(job_skills)) * 100
         
         # Cap at 100
         return min(match_percentage, 100.0)
     
-    def _calculate_experience_score(
-        self,
-        resume_years: float,
-        job_level: str
-    ) -> float:
+    @staticmethod
+    def _experience_scores(years: np.ndarray, levels: np.ndarray) -> np.ndarray:
         """
-        Calculate experience level match score.
+        Calculate experience level match scores for many inputs at once.
+        
+        Inputs broadcast against each other, e.g. years of shape (M, 1) and
+        levels of shape (K,) give an (M, K) matrix of scores.
         
         Args:
-            resume_years: Years of experience from resume
-            job_level: Experience level required (junior, mid, senior)
+            years: Years of experience from resumes
+            levels: Job level indexes from EXPERIENCE_LEVELS (-1: no level)
             
         Returns:
-            Score from 0-100
+            Scores from 0-100
         """
-        # Experience level thresholds
-        level_ranges = {
-            'entry': (0, 2),
-            'junior': (0, 3),
-            'mid': (2, 6),
-            'middle': (2, 6),
-            'senior': (5, 15),
-            'lead': (7, 20),
-            'principal': (10, 25),
-            'staff': (8, 20)
-        }
+        years = np.asarray(years, dtype=np.float64)
+        levels = np.asarray(levels, dtype=np.intp)
+        min_years = _LEVEL_MIN_YEARS[levels]
+        max_years = _LEVEL_MAX_YEARS[levels]
         
-        # If no specific level mentioned, use years directly
-        if not job_level or job_level not in level_ranges:
-            # Score based on having reasonable experience
-            if resume_years < 1:
-                return 40.0
-            elif resume_years <= 3:
-                return 70.0
-            elif resume_years <= 7:
-                return 90.0
-            else:
-                return 100.0
-        
-        min_years, max_years = level_ranges[job_level]
-        
-        # Perfect match: within range
-        if min_years <= resume_years <= max_years:
-            return 100.0
-        
-        # Overqualified: more experience than max
-        elif resume_years > max_years:
-            # Slightly penalize being overqualified
-            excess = resume_years - max_years
-            penalty = min(excess * 3, 20)  # Max 20 point penalty
-            return max(80.0, 100.0 - penalty)
-        
-        # Underqualified: less experience than min
-        else:
-            # Calculate how close they are
-            if min_years == 0:
-                return 80.0  # If min is 0, they're close
-            
-            percentage = (resume_years / min_years) * 100
-            return min(percentage, 80.0)  # Cap at 80 if underqualified
-    
-    async def _calculate_semantic_score(
-        self,
-        resume_data: Dict[str, Any],
-        job_data: Dict[str, Any]
-    ) -> float:
-        """
-        Calculate semantic similarity using embeddings.
+        # Overqualified: slightly penalize, max 20 point penalty
+        overqualified = np.maximum(80.0, 100.0 - np.minimum((years - max_years) * 3, 20))
         
-        Args:
-            resume_data: Resume information
-            job_data: Job requirements
-            
-        Returns:
-            Score from 0-100
-        """
-        try:
-            # Create resume summary text
-            resume_text = self._create_resume_summary(resume_data)
-            
-            # Create job requirements text
-            job_text = (
-                f"{job_data.get('title', '')} "
-                f"{job_data.get('description', '')} "
-                f"{job_data.get('requirements', '')}"
-            )[:1000]  # Limit length
-            
-            # Get embeddings
-            resume_embedding = await self._get_embedding(resume_text)
-            job_embedding = await self._get_embedding(job_text)
-            
-            # Calculate cosine similarity
-            similarity = self._cosine_similarity(resume_embedding, job_embedding)
-            
-            # Convert to 0-100 scale
-            # Cosine similarity is -1 to 1, but usually 0 to 1 for text
-            # Scale 0.5 (neutral) to 50, 1.0 (perfect) to 100
-            score = (similarity * 100)
-            
-            return max(0.0, min(100.0, score))
-            
-        except Exception as e:
-            logger.warning(f"Semantic scoring failed: {str(e)}")
-            return 50.0  # Neutral score on error
+        # Underqualified: how close they are, capped at 80
+        # (80 if the minimum is 0, since they're close)
+        underqualified = np.where(
+            min_years == 0,
+            80.0,
+            np.minimum(years / np.maximum(min_years, 1) * 100, 80.0)
+        )
+        
+        level_score = np.where(
+            years > max_years,
+            overqualified,
+            np.where(years >= min_years, 100.0, underqualified)  # Perfect match: within range
+        )
+        
+        # If no specific level mentioned, score having reasonable experience
+        no_level_score = np.select(
+            [years < 1, years <= 3, years <= 7],
+            [40.0, 70.0, 90.0],
+            100.0
+        )
+        
+        return np.where(levels < 0, no_level_score, level_score)
+    
+    def _create_job_text(self, job_data: Dict[str, Any]) -> str:
+        """Create the job requirements text for embedding."""
+        return truncate_tokens(
+            f"{job_data.get('title', '')} "
+            f"{job_data.get('description', '')} "
+            f"{job_data.get('requirements', '')}",
+            EMBEDDING_MAX_TOKENS,
+            self.embedding_model
+        )
     
     def _create_resume_summary(self, resume_data: Dict[str, Any]) -> str:
         """Create a text summary of resume for embedding."""
@@ -261,34 +449,252 @@ class ScoringService:
         if resume_data.get('summary'):
             parts.append(resume_data['summary'])
         
-        return " ".join(parts)[:500]  # Limit length
+        return truncate_tokens(" ".join(parts), EMBEDDING_MAX_TOKENS, self.embedding_model)
     
-    async def _get_embedding(self, text: str) -> List[float]:
-        """Get embedding vector for text."""
+    async def _get_embeddings_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Get unit-length float16 embedding vectors for many texts.
+        
+        Vectors are cached by a hash of the model and text, so a job scored
+        against many resumes, or a re-score, skips the embeddings API. Texts
+        already being embedded by a concurrent call wait for that request
+        instead of issuing their own.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding per text, in input order
+            
+        Raises:
+            Exception: If any text's embedding can't be generated
+        """
+        keys = [self._embedding_key(text) for text in texts]
+        vectors: Dict[bytes, Optional[np.ndarray]] = {}
+        waiting: Dict[bytes, asyncio.Future] = {}
+        missing: Dict[bytes, str] = {}
+        
+        for key, text in zip(keys, texts):
+            if key in vectors or key in waiting or key in missing:
+                continue
+            cached = self._embedding_cache.get(key)
+            if cached is not None:
+                vectors[key] = cached
+            elif key in self._embedding_requests:
+                waiting[key] = self._embedding_requests[key]
+            else:
+                missing[key] = text
+        
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in missing}
+        self._embedding_requests.update(futures)
         try:
-            response = await self.client.embeddings.create(
-                model=self.embedding_model,
-                input=text
+            # Fetch missing texts while waiting on requests other callers
+            # started (shielded: cancelling this call must not cancel theirs)
+            fetched, *waited = await asyncio.gather(
+                self._fetch_embeddings(list(missing.values())),
+                *(asyncio.shield(future) for future in waiting.values())
+            )
+            for key, vector in zip(missing, fetched):
+                self._embedding_cache.set(key, vector)
+                vectors[key] = vector
+                futures[key].set_result(vector)
+            vectors.update(zip(waiting, waited))
+        finally:
+            # Never leave waiters hanging: on failure or cancellation they
+            # get None and raise below
+            for key, future in futures.items():
+                if not future.done():
+                    future.set_result(None)
+                self._embedding_requests.pop(key, None)
+        
+        if any(vector is None for vector in vectors.values()):
+            # A concurrent caller's request for some of these texts failed
+            raise Exception("Failed to generate embeddings")
+        
+        return [vectors[key] for key in keys]
+    
+    def _embedding_key(self, text: str) -> bytes:
+        """Cache key for a text's embedding under the current model."""
+        return hashlib.blake2b(
+            f"{self.embedding_model}:{self.embedding_dimensions}\0{text}".encode("utf-8"),
+            digest_size=16
+        ).digest()
+    
+    async def _fetch_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed texts with the embeddings API through the micro-batcher.
+        
+        Texts wait up to EMBEDDING_BATCH_WINDOW for texts from concurrent
+        callers and are sent together (see _flush_embeddings), so requests
+        from separate handlers share embeddings calls.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding per text, in input order
+            
+        Raises:
+            Exception: If an embeddings request for the texts failed
+        """
+        if not texts:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self._embedding_queue.extend(zip(texts, futures))
+        
+        if len(self._embedding_queue) >= EMBEDDING_BATCH_SIZE:
+            self._flush_embeddings()
+        elif self._embedding_flush is None:
+            self._embedding_flush = loop.call_later(
+                EMBEDDING_BATCH_WINDOW, self._flush_embeddings
             )
-            return response.data[0].embedding
+        
+        return list(await asyncio.gather(*futures))
+    
+    def _flush_embeddings(self) -> None:
+        """
+        Send all queued texts as embeddings requests.
+        
+        Texts are sorted by length before being split into requests of at
+        most EMBEDDING_BATCH_SIZE inputs and EMBEDDING_MAX_BATCH_TOKENS
+        tokens, so each request holds texts of similar size and stays within
+        the API's limits; the requests run concurrently.
+        """
+        if self._embedding_flush is not None:
+            self._embedding_flush.cancel()
+            self._embedding_flush = None
+        
+        queue = sorted(self._embedding_queue, key=lambda item: len(item[0]))
+        self._embedding_queue = []
+        
+        batch: List[Tuple[str, asyncio.Future]] = []
+        batch_tokens = 0
+        for item in queue:
+            tokens = count_tokens(item[0], self.embedding_model)
+            if batch and (
+                len(batch) == EMBEDDING_BATCH_SIZE
+                or batch_tokens + tokens > EMBEDDING_MAX_BATCH_TOKENS
+            ):
+                self._start_embeddings(batch)
+                batch, batch_tokens = [], 0
+            batch.append(item)
+            batch_tokens += tokens
+        if batch:
+            self._start_embeddings(batch)
+    
+    def _start_embeddings(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Send one batch of queued texts as a background embeddings request."""
+        task = asyncio.create_task(self._send_embeddings(batch))
+        # Keep strong references so running tasks are not garbage collected
+        self._embedding_tasks.add(task)
+        task.add_done_callback(self._embedding_tasks.discard)
+    
+    async def _send_embeddings(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed one flushed batch and resolve its callers' futures."""
+        # Futures of cancelled callers are already done
+        try:
+            vectors = await self._create_embeddings([text for text, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+    
+    async def _create_embeddings(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed one batch of texts in a single embeddings request.
+        
+        Vectors are normalized to unit length in float32 and stored as
+        float16: half the memory and bandwidth, and cosine similarity moves by
+        well under 0.001. score_matrix computes in float32. Failures raise
+        (and are not cached) instead of yielding placeholder vectors.
+        """
+        try:
+            async with openai_semaphore:
+                response = await self.client.embeddings.create(
+                    model=self.embedding_model,
+                    input=texts,
+                    dimensions=self.embedding_dimensions or NOT_GIVEN
+                )
+            # Vectors come back in input order
+            vectors = np.asarray([d.embedding for d in response.data], dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1, norms)
+            return list(vectors.astype(np.float16))
         except Exception as e:
             logger.error(f"Embedding generation failed: {str(e)}")
-            # Return zero vector on error
-            return [0.0] * 1536
+            raise Exception(f"Failed to generate embeddings: {str(e)}")
     
     @staticmethod
-    def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        import math
+    def score_matrix(resume_embs: np.ndarray, job_embs: np.ndarray) -> np.ndarray:
+        """
+        Calculate cosine similarity for every resume/job pair at once.
         
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = math.sqrt(sum(a * a for a in vec1))
-        magnitude2 = math.sqrt(sum(b * b for b in vec2))
+        Rows are normalized and multiplied in a single float32 matrix
+        product (one BLAS GEMM call) instead of a similarity per pair.
         
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
+        Args:
+            resume_embs: Resume embeddings, shape (M, d)
+            job_embs: Job embeddings, shape (K, d)
+            
+        Returns:
+            Similarity matrix, shape (M, K); zero rows give 0.0
+        """
+        def normalize(matrix: np.ndarray) -> np.ndarray:
+            matrix = np.asarray(matrix, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            return matrix / np.where(norms == 0, 1, norms)
         
-        return dot_product / (magnitude1 * magnitude2)
+        return normalize(resume_embs) @ normalize(job_embs).T
+    
+    async def _skill_synonyms(
+        self,
+        resume_skills: List[FrozenSet[str]],
+        job_skills: List[List[str]]
+    ) -> Dict[str, FrozenSet[str]]:
+        """
+        Find resume skills that mean the same as job skills.
+        
+        Every distinct skill is embedded once (cached like other texts) and
+        all resume x job skill similarities come from one matrix product.
+        
+        Args:
+            resume_skills: Normalized skills per resume
+            job_skills: Skills per job
+            
+        Returns:
+            Resume skills with similarity >= SKILL_SYNONYM_SIMILARITY, by job skill
+        """
+        all_resume_skills = sorted(frozenset().union(*resume_skills))
+        all_job_skills = sorted({skill for skills in job_skills for skill in skills})
+        if not all_resume_skills or not all_job_skills:
+            return {}
+        
+        embeddings = await self._get_embeddings_batch(all_job_skills + all_resume_skills)
+        similarities = self.score_matrix(
+            np.stack(embeddings[len(all_job_skills):]),
+            np.stack(embeddings[:len(all_job_skills)])
+        )
+        matches = similarities >= settings.SKILL_SYNONYM_SIMILARITY
+        
+        return {
+            job_skill: frozenset(
+                all_resume_skills[i] for i in np.flatnonzero(matches[:, k])
+            )
+            for k, job_skill in enumerate(all_job_skills)
+            if matches[:, k].any()
+        }
     
     @staticmethod
     def _extract_skills_from_text(text: str) -> List[str]:
@@ -296,25 +702,7 @@ class ScoringService:
         Extract potential skills from job description text.
         Simple keyword extraction for common tech skills.
         """
-        # Common tech skills (lowercase)
-        common_skills = [
-            'python', 'java', 'javascript', 'typescript', 'go', 'rust', 'c++', 'c#',
-            'react', 'vue', 'angular', 'node', 'fastapi', 'django', 'flask',
-            'postgresql', 'mysql', 'mongodb', 'redis', 'elasticsearch',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform',
-            'git', 'ci/cd', 'jenkins', 'gitlab', 'github',
-            'machine learning', 'deep learning', 'ai', 'nlp',
-            'rest api', 'graphql', 'microservices', 'agile', 'scrum'
-        ]
-        
-        text_lower = text.lower()
-        found_skills = []
-        
-        for skill in common_skills:
-            if skill in text_lower:
-                found_skills.append(skill)
-        
-        return found_skills
+        return list(dict.fromkeys(_SKILL_PATTERN.findall(text.lower())))
 
 
 # Global instance
@@ -0,0 +1,64 @@
+"""
+In-process task queue: bounded concurrent execution of background jobs.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Set
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    """
+    Run coroutines concurrently with an upper bound on how many are in flight.
+
+    FastAPI BackgroundTasks run one after another in a single coroutine, so
+    I/O-bound work (storage fetches, LLM calls) never overlaps. Tasks submitted
+    here are scheduled immediately and wait on a semaphore instead.
+    """
+
+    def __init__(self, max_concurrency: int):
+        """
+        Initialize the queue.
+
+        Args:
+            max_concurrency: Maximum number of tasks running at once
+        """
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Keep strong references so running tasks are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, func: Callable[..., Awaitable[Any]], *args: Any) -> asyncio.Task:
+        """
+        Schedule a coroutine function to run on the queue.
+
+        Args:
+            func: Coroutine function to run
+            *args: Positional arguments for func
+
+        Returns:
+            The scheduled task
+        """
+        task = asyncio.create_task(self._run(func, *args))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+        """Run a single task under the concurrency limit."""
+        async with self._semaphore:
+            try:
+                await func(*args)
+            except Exception as e:
+                logger.error(f"Background task {func.__name__} failed: {str(e)}")
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted tasks that have not finished yet."""
+        return len(self._tasks)
+
+
+# Singleton instances for resume parsing and scoring
+parse_queue = TaskQueue(max_concurrency=8)
+scoring_queue = TaskQueue(max_concurrency=8)
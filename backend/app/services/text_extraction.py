@@ -1,15 +1,73 @@
 """
 Text extraction service: Extract text from PDF and DOCX files.
 """
+import asyncio
 import io
 import logging
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from typing import Optional
 
-from pypdf import PdfReader
-import docx
+import pypdfium2 as pdfium
+from lxml import etree
 
 logger = logging.getLogger(__name__)
 
+# Runs of whitespace, collapsed to one space in a single C-level pass
+_WS_RE = re.compile(r"\s+")
+
+# WordprocessingML elements read from DOCX: text runs, paragraph ends, and
+# tabs/line breaks (which separate words without their own text)
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_T = f"{_W_NS}t"
+_W_P = f"{_W_NS}p"
+_DOCX_TEXT_TAGS = (_W_T, _W_P, f"{_W_NS}tab", f"{_W_NS}br", f"{_W_NS}cr")
+
+
+@lru_cache(maxsize=1)
+def get_extraction_executor() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool for text extraction.
+    
+    Workers are spawned rather than forked, so they don't inherit the
+    server's threads and held locks.
+    
+    Returns:
+        ProcessPoolExecutor instance
+    """
+    return ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _replace_extraction_executor(broken: ProcessPoolExecutor) -> None:
+    """
+    Shut down a broken process pool and start a fresh one in its place.
+    
+    Concurrent extractions on the same pool all see it break; only the first
+    replaces it, so a pool started by another caller is never discarded.
+    
+    Args:
+        broken: Pool that raised BrokenProcessPool
+    """
+    broken.shutdown(wait=False, cancel_futures=True)
+    if get_extraction_executor() is broken:
+        get_extraction_executor.cache_clear()
+        get_extraction_executor()
+
+
+def close_extraction_executor() -> None:
+    """Shut down the extraction process pool if it was started."""
+    if get_extraction_executor.cache_info().currsize:
+        get_extraction_executor().shutdown(cancel_futures=True)
+        get_extraction_executor.cache_clear()
+
 
 class TextExtractionService:
     """Extract text from resume files."""
@@ -30,19 +88,41 @@ class TextExtractionService:
         Raises:
             Exception: If extraction fails
         """
+        executor = get_extraction_executor()
         try:
-            if file_type.lower() == "pdf":
-                return await TextExtractionService._extract_from_pdf_bytes(file_content)
-            elif file_type.lower() in ["docx", "doc"]:
-                return await TextExtractionService._extract_from_docx_bytes(file_content)
-            else:
-                raise ValueError(f"Unsupported file type: {file_type}")
+            # Parsing is CPU-bound; run it in a worker process so it neither
+            # stalls the event loop nor holds this process's GIL, and large
+            # files are extracted in parallel on separate cores (each worker
+            # is single-threaded, so PDFium calls never overlap)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                executor,
+                TextExtractionService._extract_text_sync,
+                file_content,
+                file_type
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. crashed on a malformed file): replace the
+            # pool so later extractions don't fail too
+            logger.error(f"Text extraction worker died on {file_type} file")
+            _replace_extraction_executor(executor)
+            raise
         except Exception as e:
             logger.error(f"Failed to extract text from {file_type} file: {str(e)}")
             raise
     
     @staticmethod
-    async def _extract_from_pdf_bytes(file_content: bytes) -> str:
+    def _extract_text_sync(file_content: bytes, file_type: str) -> str:
+        """Dispatch to the extractor for file_type (blocking)."""
+        if file_type.lower() == "pdf":
+            return TextExtractionService._extract_from_pdf_bytes(file_content)
+        elif file_type.lower() in ["docx", "doc"]:
+            return TextExtractionService._extract_from_docx_bytes(file_content)
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
+    
+    @staticmethod
+    def _extract_from_pdf_bytes(file_content: bytes) -> str:
         """
         Extract text from PDF bytes.
         
@@ -53,24 +133,28 @@ class TextExtractionService:
             Extracted text
         """
         try:
-            # Create a BytesIO object from bytes
-            pdf_file = io.BytesIO(file_content)
+            # Read PDF with PDFium (C++ text extraction)
+            pdf = pdfium.PdfDocument(file_content)
+            try:
+                page_count = len(pdf)
+                # Page text is streamed into one buffer (no list of parts)
+                buffer = io.StringIO()
+                
+                for page in pdf:
+                    text = page.get_textpage().get_text_bounded()
+                    if text:
+                        buffer.write(text)
+                        buffer.write("\n")
+            finally:
+                # Also closes the pages and text pages
+                pdf.close()
             
-            # Read PDF
-            reader = PdfReader(pdf_file)
-            text_parts = []
-            
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    text_parts.append(text)
-            
-            full_text = "\n".join(text_parts)
+            full_text = buffer.getvalue()
             
             # Clean up excessive whitespace
-            full_text = " ".join(full_text.split())
+            full_text = _WS_RE.sub(" ", full_text).strip()
             
-            logger.info(f"Extracted {len(full_text)} characters from PDF ({len(reader.pages)} pages)")
+            logger.info(f"Extracted {len(full_text)} characters from PDF ({page_count} pages)")
             return full_text
             
         except Exception as e:
@@ -78,7 +162,7 @@ class TextExtractionService:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
     
     @staticmethod
-    async def _extract_from_docx_bytes(file_content: bytes) -> str:
+    def _extract_from_docx_bytes(file_content: bytes) -> str:
         """
         Extract text from DOCX bytes.
         
@@ -89,29 +173,29 @@ class TextExtractionService:
             Extracted text
         """
         try:
-            # Create a BytesIO object from bytes
-            docx_file = io.BytesIO(file_content)
-            
-            # Read DOCX
-            doc = docx.Document(docx_file)
-            text_parts = []
-            
-            # Extract from paragraphs
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_parts.append(paragraph.text)
+            buffer = io.StringIO()
             
-            # Extract from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        if cell.text.strip():
-                            text_parts.append(cell.text)
+            # Stream word/document.xml straight from the zip; paragraphs
+            # (including those in table cells) in document order
+            with zipfile.ZipFile(io.BytesIO(file_content)) as archive:
+                with archive.open("word/document.xml") as xml_file:
+                    for _, element in etree.iterparse(
+                        xml_file, events=("end",), tag=_DOCX_TEXT_TAGS
+                    ):
+                        if element.tag == _W_T:
+                            if element.text:
+                                buffer.write(element.text)
+                        elif element.tag == _W_P:
+                            buffer.write("\n")
+                            # Drop parsed paragraphs to keep memory flat
+                            element.clear()
+                        else:
+                            buffer.write(" ")  # tab or line break
             
-            full_text = "\n".join(text_parts)
+            full_text = buffer.getvalue()
             
             # Clean up excessive whitespace
-            full_text = " ".join(full_text.split())
+            full_text = _WS_RE.sub(" ", full_text).strip()
             
             logger.info(f"Extracted {len(full_text)} characters from DOCX")
             return full_text
@@ -136,29 +220,47 @@ class TextExtractionService:
         if len(text) <= chunk_size:
             return [text]
         
-        chunks = []
+        # Find all boundaries first, then slice once per chunk
+        chunks = [
+            text[start:end].strip()
+            for start, end in TextExtractionService._chunk_bounds(text, chunk_size, overlap)
+        ]
+        
+        logger.info(f"Split text into {len(chunks)} chunks")
+        return chunks
+    
+    @staticmethod
+    def _chunk_bounds(text: str, chunk_size: int, overlap: int) -> list[tuple[int, int]]:
+        """
+        Compute (start, end) offsets of the chunks of text.
+        
+        Each chunk ends at the last sentence end (". ") in its second half,
+        else at the last space there, else at chunk_size characters.
+        """
+        text_length = len(text)
+        min_break = chunk_size // 2
+        bounds = []
         start = 0
         
-        while start < len(text):
+        while start < text_length:
             end = start + chunk_size
             
             # Try to break at a sentence or word boundary
-            if end < len(text):
+            if end < text_length:
                 # Look for sentence end
                 sentence_end = text.rfind(". ", start, end)
-                if sentence_end != -1 and sentence_end > start + chunk_size // 2:
+                if sentence_end > start + min_break:
                     end = sentence_end + 1
                 else:
                     # Look for word boundary
                     space = text.rfind(" ", start, end)
-                    if space != -1 and space > start + chunk_size // 2:
+                    if space > start + min_break:
                         end = space
             
-            chunks.append(text[start:end].strip())
+            bounds.append((start, end))
             start = end - overlap
         
-        logger.info(f"Split text into {len(chunks)} chunks")
-        return chunks
+        return bounds
 
 
 # Global instance
@@ -0,0 +1,109 @@
+"""
+Tests for the in-process TTL cache.
+"""
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_returns_stored_value_or_default():
+    c = TTLCache(maxsize=4)
+    c.set("a", 1)
+    assert c.get("a") == 1
+    assert c.get("missing") is None
+    assert c.get("missing", "default") == "default"
+
+
+def test_evicts_least_recently_used_when_full():
+    c = TTLCache(maxsize=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")  # "b" is now the least recently used
+    c.set("c", 3)
+    assert c.get("a") == 1
+    assert c.get("b") is None
+    assert c.get("c") == 3
+    assert len(c) == 2
+
+
+def test_set_existing_key_refreshes_value_without_growing():
+    c = TTLCache(maxsize=2)
+    c.set("a", 1)
+    c.set("a", 2)
+    assert c.get("a") == 2
+    assert len(c) == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    c = TTLCache(maxsize=4, ttl=10)
+    c.set("a", 1)
+
+    clock.now += 9.9
+    assert c.get("a") == 1
+
+    clock.now += 0.2
+    assert c.get("a") is None
+    assert len(c) == 0  # expired entries are dropped on read
+
+
+def test_no_ttl_never_expires(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    c = TTLCache(maxsize=4)
+    c.set("a", 1)
+    clock.now += 10 ** 9
+    assert c.get("a") == 1
+
+
+def test_falsy_values_are_cached():
+    c = TTLCache(maxsize=4)
+    c.set("empty", [])
+    assert c.get("empty", "default") == []
+
+
+def test_delete_and_clear():
+    c = TTLCache(maxsize=4)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.delete("a")
+    c.delete("missing")
+    assert c.get("a") is None
+    c.clear()
+    assert len(c) == 0
+
+
+def test_delete_prefix_only_removes_matching_string_keys():
+    c = TTLCache(maxsize=8)
+    c.set("job1:a", 1)
+    c.set("job1:b", 2)
+    c.set("job10:a", 3)
+    c.set(("job1:", "tuple"), 4)
+    c.delete_prefix("job1:")
+    assert c.get("job1:a") is None
+    assert c.get("job1:b") is None
+    assert c.get("job10:a") == 3
+    assert c.get(("job1:", "tuple")) == 4
+
+
+def test_invalidate_job_resumes_clears_listing_caches():
+    cache.leaderboard_cache.set("job1:user:10", ["entry"])
+    cache.resume_list_cache.set("job1:user:None:0:100", b"[]")
+    cache.resume_list_cache.set("job2:user:None:0:100", b"[]")
+
+    cache.invalidate_job_resumes("job1")
+
+    assert cache.leaderboard_cache.get("job1:user:10") is None
+    assert cache.resume_list_cache.get("job1:user:None:0:100") is None
+    assert cache.resume_list_cache.get("job2:user:None:0:100") == b"[]"
+    cache.resume_list_cache.clear()
@@ -0,0 +1,46 @@
+"""
+Tests for identifier generation.
+"""
+import time
+from uuid import UUID
+
+from app.core import ids
+from app.core.ids import uuid7
+
+
+def test_version_and_variant():
+    value = uuid7()
+    assert isinstance(value, UUID)
+    assert value.version == 7
+    assert value.variant == "specified in RFC 4122"
+
+
+def test_timestamp_is_unix_milliseconds_in_first_48_bits():
+    before = time.time_ns() // 1_000_000
+    value = uuid7()
+    after = time.time_ns() // 1_000_000
+    assert before <= value.int >> 80 <= after
+
+
+def test_bit_layout(monkeypatch):
+    monkeypatch.setattr(ids.time, "time_ns", lambda: 0x0123_4567_89AB * 1_000_000)
+    monkeypatch.setattr(ids.os, "urandom", lambda n: b"\xff" * n)
+    value = uuid7().int
+
+    assert value >> 80 == 0x0123_4567_89AB           # unix_ts_ms
+    assert (value >> 76) & 0xF == 0x7                # version
+    assert (value >> 64) & 0xFFF == 0xFFF            # rand_a
+    assert (value >> 62) & 0b11 == 0b10              # variant
+    assert value & 0x3FFF_FFFF_FFFF_FFFF == 0x3FFF_FFFF_FFFF_FFFF  # rand_b
+
+
+def test_ids_from_later_milliseconds_sort_after_earlier_ones(monkeypatch):
+    clock = iter([1_000 * 1_000_000, 1_001 * 1_000_000, 1_002 * 1_000_000])
+    monkeypatch.setattr(ids.time, "time_ns", lambda: next(clock))
+    first, second, third = uuid7(), uuid7(), uuid7()
+    assert first < second < third
+    assert str(first) < str(second) < str(third)
+
+
+def test_ids_are_unique():
+    assert len({uuid7() for _ in range(10_000)}) == 10_000
@@ -0,0 +1,255 @@
+"""
+Tests for the resume scoring service.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import scoring
+from app.services.scoring import ScoringService, normalize_skills
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """Scoring service with embeddings faked and texts left untruncated."""
+    monkeypatch.setattr(scoring, "truncate_tokens", lambda text, max_tokens, model=None: text)
+    svc = ScoringService()
+    svc.embedded = []
+
+    async def fake_embeddings(texts):
+        svc.embedded.extend(texts)
+        # Every text gets the same direction: similarity 1.0
+        return [np.ones(4, dtype=np.float16) / 2 for _ in texts]
+
+    svc._get_embeddings_batch = fake_embeddings
+    return svc
+
+
+SENIOR_PYTHON_JOB = {
+    'title': 'Backend engineer',
+    'description': 'Python and Docker',
+    'requirements': '',
+    'experience_level': 'senior'
+}
+
+
+class TestExtractSkillsFromText:
+    """Job skills are matched as whole words, not substrings."""
+
+    def test_matches_skills_in_order_of_appearance(self):
+        text = "Python developer with Docker, AWS and PostgreSQL"
+        assert ScoringService._extract_skills_from_text(text) == [
+            'python', 'docker', 'aws', 'postgresql'
+        ]
+
+    def test_deduplicates(self):
+        assert ScoringService._extract_skills_from_text("python, Python, PYTHON") == ['python']
+
+    def test_skill_inside_longer_word_does_not_match(self):
+        assert ScoringService._extract_skills_from_text("javascript") == ['javascript']
+        assert ScoringService._extract_skills_from_text("github") == ['github']
+        assert ScoringService._extract_skills_from_text("a good email about our digital domain") == []
+
+    def test_skills_with_symbols(self):
+        text = "C++ and C# services, Node.js APIs, CI/CD pipelines"
+        assert ScoringService._extract_skills_from_text(text) == ['c++', 'c#', 'node', 'ci/cd']
+
+    def test_c_plus_plus_is_not_c_sharp(self):
+        assert ScoringService._extract_skills_from_text("c++") == ['c++']
+        assert ScoringService._extract_skills_from_text("c#") == ['c#']
+
+    def test_node_js_matches_node(self):
+        assert ScoringService._extract_skills_from_text("node.js") == ['node']
+        assert ScoringService._extract_skills_from_text("nodejs") == []
+
+    def test_multi_word_skills(self):
+        text = "Machine learning and NLP; REST API design"
+        assert ScoringService._extract_skills_from_text(text) == [
+            'machine learning', 'nlp', 'rest api'
+        ]
+
+    def test_punctuation_boundaries(self):
+        assert ScoringService._extract_skills_from_text("(go), [rust]; java.") == [
+            'go', 'rust', 'java'
+        ]
+
+
+def test_normalize_skills():
+    assert normalize_skills([" Python", "python", "Docker ", "", "  ", "AWS"]) == [
+        'aws', 'docker', 'python'
+    ]
+    assert normalize_skills([]) == []
+
+
+class TestScoreMatrix:
+    """Cosine similarity for every resume/job pair."""
+
+    def test_matches_pairwise_cosine_similarity(self):
+        rng = np.random.default_rng(0)
+        resumes = rng.normal(size=(5, 16))
+        jobs = rng.normal(size=(3, 16))
+        expected = np.array([
+            [r @ j / (np.linalg.norm(r) * np.linalg.norm(j)) for j in jobs]
+            for r in resumes
+        ])
+        np.testing.assert_allclose(ScoringService.score_matrix(resumes, jobs), expected, atol=1e-5)
+
+    def test_shape_and_dtype(self):
+        result = ScoringService.score_matrix(np.ones((4, 8)), np.ones((2, 8)))
+        assert result.shape == (4, 2)
+        assert result.dtype == np.float32
+
+    def test_zero_rows_give_zero(self):
+        resumes = np.array([[0.0, 0.0], [1.0, 0.0]])
+        jobs = np.array([[1.0, 0.0], [0.0, 0.0]])
+        np.testing.assert_allclose(
+            ScoringService.score_matrix(resumes, jobs), [[0.0, 0.0], [1.0, 0.0]]
+        )
+
+    def test_accepts_float16(self):
+        vectors = np.array([[3.0, 4.0]], dtype=np.float16)
+        np.testing.assert_allclose(ScoringService.score_matrix(vectors, vectors), [[1.0]], atol=1e-3)
+
+
+class TestDecisionThresholds:
+    """Pairs decided by skills and experience skip the semantic score."""
+
+    def test_disabled_by_default(self, service):
+        assert settings.SCORING_REJECT_THRESHOLD == 0.0
+        assert settings.SCORING_ACCEPT_THRESHOLD == 100.0
+
+        scores = asyncio.run(service.score_resumes(
+            [{'skills': [], 'total_experience_years': 0, 'summary': 'weak'}],
+            SENIOR_PYTHON_JOB
+        ))
+
+        # skills 0, experience 0, semantic 100 (similarity 1.0)
+        assert scores == [25.0]
+        assert any('weak' in text for text in service.embedded)
+
+    def test_rejected_pairs_skip_embeddings(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_REJECT_THRESHOLD", 30.0)
+
+        scores = asyncio.run(service.score_resumes(
+            [
+                {'skills': [], 'total_experience_years': 0, 'summary': 'weak'},
+                {'skills': ['Python'], 'total_experience_years': 6, 'summary': 'strong'}
+            ],
+            SENIOR_PYTHON_JOB
+        ))
+
+        # Best possible score of the weak resume is 25 < 30: semantic is 0
+        assert scores[0] == 0.0
+        # skills 50 (1 of 2), experience 100, semantic 100
+        assert scores[1] == 75.0
+        assert not any('weak' in text for text in service.embedded)
+        assert any('strong' in text for text in service.embedded)
+
+    def test_reject_threshold_is_strict(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_REJECT_THRESHOLD", 25.0)
+
+        scores = asyncio.run(service.score_resumes(
+            [{'skills': [], 'total_experience_years': 0, 'summary': 'weak'}],
+            SENIOR_PYTHON_JOB
+        ))
+
+        assert scores == [25.0]
+        assert any('weak' in text for text in service.embedded)
+
+    def test_accepted_pairs_get_semantic_midpoint(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_ACCEPT_THRESHOLD", 70.0)
+
+        scores = asyncio.run(service.score_resumes(
+            [{'skills': ['python', 'docker'], 'total_experience_years': 6, 'summary': 'strong'}],
+            SENIOR_PYTHON_JOB
+        ))
+
+        # skills 100, experience 100 (base 75 > 70), semantic 50
+        assert scores == [87.5]
+        assert service.embedded == []
+
+    def test_only_undecided_jobs_are_embedded(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "SCORING_REJECT_THRESHOLD", 55.0)
+        other_job = {'title': 'Rust engineer', 'description': 'Rust', 'experience_level': 'senior'}
+
+        scores = asyncio.run(service.score_resumes_for_jobs(
+            [{'skills': ['Python'], 'total_experience_years': 6, 'summary': 'strong'}],
+            [SENIOR_PYTHON_JOB, other_job]
+        ))
+
+        # Python job: skills 50, experience 100, best possible 75 (scored)
+        # Rust job: skills 0, experience 100, best possible 50 (rejected)
+        assert scores == [[75.0, 25.0]]
+        assert any('Python' in text for text in service.embedded)
+        assert not any('Rust' in text for text in service.embedded)
+
+
+class TestEmbeddingBatches:
+    """Queued texts are sent in requests bounded by count and tokens."""
+
+    @staticmethod
+    def fake_client(requests, fail=False):
+        async def create(model, input, dimensions):
+            requests.append(list(input))
+            if fail:
+                raise RuntimeError("rate limited")
+            return SimpleNamespace(
+                data=[SimpleNamespace(embedding=[1.0, float(len(text))]) for text in input]
+            )
+        return SimpleNamespace(embeddings=SimpleNamespace(create=create))
+
+    def test_batches_split_by_token_budget(self, monkeypatch):
+        monkeypatch.setattr(scoring, "count_tokens", lambda text, model=None: len(text.split()))
+        monkeypatch.setattr(scoring, "EMBEDDING_MAX_BATCH_TOKENS", 10)
+        requests = []
+        svc = ScoringService()
+        svc.client = self.fake_client(requests)
+
+        texts = [f"w w w w {i}" for i in range(5)]  # 5 tokens each
+        vectors = asyncio.run(svc._get_embeddings_batch(texts))
+
+        assert [len(request) for request in requests] == [2, 2, 1]
+        assert sorted(text for request in requests for text in request) == texts
+        assert len(vectors) == 5
+        assert all(np.isclose(np.linalg.norm(v.astype(np.float32)), 1.0, atol=1e-3) for v in vectors)
+
+    def test_batches_split_by_count(self, monkeypatch):
+        monkeypatch.setattr(scoring, "count_tokens", lambda text, model=None: 1)
+        monkeypatch.setattr(scoring, "EMBEDDING_BATCH_SIZE", 3)
+        requests = []
+        svc = ScoringService()
+        svc.client = self.fake_client(requests)
+
+        asyncio.run(svc._get_embeddings_batch([f"text {i}" for i in range(7)]))
+
+        assert [len(request) for request in requests] == [3, 3, 1]
+
+    def test_cached_texts_are_not_requested_again(self, monkeypatch):
+        monkeypatch.setattr(scoring, "count_tokens", lambda text, model=None: 1)
+        requests = []
+        svc = ScoringService()
+        svc.client = self.fake_client(requests)
+
+        async def embed_twice():
+            await svc._get_embeddings_batch(["a", "b"])
+            await svc._get_embeddings_batch(["b", "c", "c"])
+
+        asyncio.run(embed_twice())
+
+        assert requests == [["a", "b"], ["c"]]
+
+    def test_failure_raises_instead_of_scoring(self, monkeypatch):
+        monkeypatch.setattr(scoring, "count_tokens", lambda text, model=None: 1)
+        monkeypatch.setattr(scoring, "truncate_tokens", lambda text, max_tokens, model=None: text)
+        svc = ScoringService()
+        svc.client = self.fake_client([], fail=True)
+
+        with pytest.raises(Exception, match="Failed to generate embeddings"):
+            asyncio.run(svc.score_resumes(
+                [{'skills': ['python'], 'summary': 'resume'}], SENIOR_PYTHON_JOB
+            ))
+        # Failures are not cached
+        assert len(svc._embedding_cache) == 0
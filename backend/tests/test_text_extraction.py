@@ -0,0 +1,45 @@
+"""
+Tests for text chunking.
+"""
+from app.services.text_extraction import TextExtractionService
+
+
+def test_short_text_is_one_chunk():
+    assert TextExtractionService.chunk_text("short text", chunk_size=100) == ["short text"]
+
+
+def test_bounds_cover_text_with_overlap():
+    text = "word " * 500
+    bounds = TextExtractionService._chunk_bounds(text, chunk_size=200, overlap=20)
+
+    assert bounds[0][0] == 0
+    assert bounds[-1][1] >= len(text)
+    for (_, prev_end), (start, _) in zip(bounds, bounds[1:]):
+        assert start == prev_end - 20
+
+
+def test_breaks_at_last_sentence_end_in_second_half():
+    text = "a" * 60 + ". " + "b" * 20 + ". " + "c" * 100
+    bounds = TextExtractionService._chunk_bounds(text, chunk_size=100, overlap=0)
+    # Second ". " (at 82) wins over the first; end keeps the period
+    assert bounds[0] == (0, 83)
+
+
+def test_sentence_end_in_first_half_falls_back_to_space():
+    text = "a" * 10 + ". " + "b" * 60 + " " + "c" * 100
+    bounds = TextExtractionService._chunk_bounds(text, chunk_size=100, overlap=0)
+    assert bounds[0] == (0, 72)
+
+
+def test_no_boundary_cuts_at_chunk_size():
+    text = "x" * 250
+    bounds = TextExtractionService._chunk_bounds(text, chunk_size=100, overlap=10)
+    assert bounds == [(0, 100), (90, 190), (180, 280)]
+
+
+def test_chunks_are_stripped_slices():
+    text = "First sentence here. " * 20
+    chunks = TextExtractionService.chunk_text(text, chunk_size=100, overlap=10)
+    bounds = TextExtractionService._chunk_bounds(text, chunk_size=100, overlap=10)
+    assert chunks == [text[start:end].strip() for start, end in bounds]
+    assert all(chunk.endswith(".") for chunk in chunks[:-1])